@@ -1,5 +1,3 @@
-from gramatika import GramatikaDataset
-
 import argparse
 import os
 
@@ -10,6 +8,19 @@ def arg_file_ext_validation(parser, choices, filename):
        parser.error("file extension is not one of {}".format(choices))
     return filename
 
+def arg_error_type_list(value):
+    return [error_type_id.strip() for error_type_id in value.split(",") if error_type_id.strip()]
+
+def arg_error_type_weights(parser, value):
+    error_type_weights = {}
+    for item in arg_error_type_list(value):
+        error_type_id, _, weight = item.rpartition("=")
+        try:
+            error_type_weights[error_type_id] = float(weight)
+        except ValueError:
+            parser.error("error type weight should be in the format of TYPE=WEIGHT, ex. SPELL=2,PUNCT=0.5")
+    return error_type_weights
+
 def get_args():
     parser = argparse.ArgumentParser(
         description="Create Indonesian Synthetic Dataset"
@@ -19,13 +30,13 @@ def get_args():
     parser.add_argument("-in", "--input_filename",
                         default=None,
                         type=str,
-                        required=True,
-                        help="The input filename. Input file should be a text file containing list of data in CoNLL-U format.")
+                        required=False,
+                        help="The input filename (required unless --serve is used). Input file should be a text file containing list of data in CoNLL-U format. Files ending with .gz or .zst are decompressed while reading.")
     parser.add_argument("-out", "--output_filename",
                         default=None,
                         type=str,
-                        required=True,
-                        help="The output filename.")
+                        required=False,
+                        help="The output filename (required unless --serve is used). If it ends with .gz or .zst, the output and parallel files are compressed the same way.")
     
     # Optional Arguments
     parser.add_argument("--sinonim_file",
@@ -48,6 +59,89 @@ def get_args():
                         default=0,
                         type=int,
                         help="Total produced sentences")
+    parser.add_argument("--shard_index",
+                        default=0,
+                        type=int,
+                        help="The index of the input part processed by this run (0 <= shard_index < shard_count)")
+    parser.add_argument("--shard_count",
+                        default=1,
+                        type=int,
+                        help="The number of parts the input file is split into. Each part is processed independently and produces total_sentence / shard_count sentences")
+    parser.add_argument("--offset_index_file",
+                        default=None,
+                        type=str,
+                        help="The file storing byte offsets of every sentence in the input file. Built if it does not exist or input file has changed. Makes the split between shards exact. Compressed input (.gz, .zst) is always split this way, with <input_filename>.offsets.json by default, since it can not be split by size without decompressing it")
+    parser.add_argument("--binary_output",
+                        action='store_true',
+                        help="Also write the dataset as binary records (source tokens, target tokens, edit spans and error type ids) to <output>_records.bin, readable with gramatika.RecordReader")
+    parser.add_argument("--error_types",
+                        default=None,
+                        type=arg_error_type_list,
+                        help="Comma separated error types to generate, ex. SPELL,PUNCT. All error types are generated by default")
+    parser.add_argument("--exclude_error_types",
+                        default=None,
+                        type=arg_error_type_list,
+                        help="Comma separated error types not to generate")
+    parser.add_argument("--error_type_weights",
+                        default=None,
+                        type=lambda value:arg_error_type_weights(parser, value),
+                        help="Comma separated relative weights of error types, ex. SPELL=2,PUNCT=0.5. Error types without weight have weight 1")
+    parser.add_argument("--fast_reader",
+                        action='store_true',
+                        help="Parse input with the minimal CoNLL-U reader of gramatika (only the fields used to generate errors) instead of conllu package, about 2.5 times faster")
+    parser.add_argument("--prefilter",
+                        action='store_true',
+                        help="Drop sentences with forbidden tokens (see has_utf8_encoding_error_or_contain_forbidden_token) from raw input before parsing. Sentences with \"(\" are left to be checked after parsing")
+    parser.add_argument("--min_sentence_length",
+                        default=None,
+                        type=int,
+                        help="Drop input sentences with less tokens than this before parsing (a multiword token counts once). Turns on --prefilter")
+    parser.add_argument("--max_sentence_length",
+                        default=None,
+                        type=int,
+                        help="Drop input sentences with more tokens than this before parsing (a multiword token counts once). Turns on --prefilter")
+    parser.add_argument("--pipeline",
+                        action='store_true',
+                        help="Read, generate and write concurrently, holding only a few chunks of input in memory. Input is shuffled inside each chunk instead of as a whole")
+    parser.add_argument("--chunk_size",
+                        default=1000,
+                        type=int,
+                        help="The number of sentences in each chunk of input, chunks are parsed in parallel (and generated one by one when --pipeline is used)")
+    parser.add_argument("--num_workers",
+                        default=None,
+                        type=int,
+                        help="The number of processes parsing input. Defaults to the number of CPUs, 1 parses in the main process")
+    parser.add_argument("--precompute_morphology_table",
+                        action='store_true',
+                        help="Resolve nominalization targets of meN- verbs in input file and save them alongside the thesaurus (<sinonim_file>_morphology.json), then exit. Nothing is done if the saved table is up to date with thesaurus and input file")
+    parser.add_argument("--prune_tesaurus",
+                        action='store_true',
+                        help="Save the thesaurus entries of words in input file (<sinonim_file>_pruned.json) with nominalization targets of its meN- verbs as morphology table, then exit. Use it as --sinonim_file when generating from the same input file")
+    parser.add_argument("--sentence_cache_size",
+                        default=0,
+                        type=int,
+                        help="The maximum number of distinct sentences whose tokens and error candidates are cached, so repeated sentences skip straight to sampling errors. 0 disables the cache")
+    parser.add_argument("--sentence_cache_file",
+                        default=None,
+                        type=str,
+                        help="The file the sentence cache is loaded from and saved to, so it is reused by the next runs with the same thesaurus and error types")
+    parser.add_argument("--quota_scheduler",
+                        action='store_true',
+                        help="Plan the number of errors of each error type from error candidates in the whole input before generating, and generate sentences with the scarcest error types first. Replaces the max ratio check of each error type")
+    parser.add_argument("--targeted",
+                        action='store_true',
+                        help="Index which sentences of the whole input can produce each error type, then draw every next sentence from the error type needed the most instead of walking through the input. Useful for datasets of rare error types (ex. --error_types MORPH,NOUN:INFL,VERB:TENSE)")
+    parser.add_argument("--variants",
+                        default=1,
+                        type=int,
+                        help="The number of error sets sampled from each input sentence. Sentence is parsed and its error candidates are enumerated once, every valid variant is written as its own sentence and counted in total_sentence")
+    parser.add_argument("--serve",
+                        action='store_true',
+                        help="Run as a generation server which keeps thesaurus and error generators loaded. Reads JSON lines requests from stdin (or --socket) and writes JSON lines responses, see gramatika/server.py")
+    parser.add_argument("--socket",
+                        default=None,
+                        type=str,
+                        help="Path of unix socket to listen on when --serve is used, instead of stdin/stdout")
     # parser.add_argument("--",
     #                     default=128,
     #                     type=int,
@@ -59,12 +153,67 @@ def get_args():
 
     args = parser.parse_args()
 
+    required = []
+    if not args.serve:
+        required.append(("-in/--input_filename", args.input_filename))
+    if not args.serve and not args.precompute_morphology_table and not args.prune_tesaurus:
+        required.append(("-out/--output_filename", args.output_filename))
+
+    if required:
+        missing = [name for name, value in required if value is None]
+        if missing:
+            parser.error("the following arguments are required: {}".format(", ".join(missing)))
+
+    if args.quota_scheduler and (args.pipeline or args.serve):
+        parser.error("--quota_scheduler can not be used with --pipeline or --serve, it needs the whole input before generating")
+    if args.targeted and (args.pipeline or args.serve):
+        parser.error("--targeted can not be used with --pipeline or --serve, it needs the whole input before generating")
+
+    # Error type selection is checked against the registry (including error types of installed plugins)
+    from gramatika.registry import ErrorRegistry
+
+    try:
+        ErrorRegistry().select_error_type_ids(args.error_types, args.exclude_error_types, args.error_type_weights)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.variants < 1:
+        parser.error("variants should be at least 1")
+    if args.variants > 1 and args.serve:
+        parser.error("--variants can not be used with --serve")
+
+    if args.shard_count < 1:
+        parser.error("shard_count should be at least 1")
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("shard_index should be in the range of 0 to shard_count - 1")
+
     return args
 
 
 def main():
     args = get_args()
 
+    # Imported after parsing arguments, so --help and argument errors return quickly
+    from gramatika import GramatikaDataset
+
+    if args.prune_tesaurus:
+        GramatikaDataset(args).prune_tesaurus()
+        return
+
+    if args.precompute_morphology_table:
+        GramatikaDataset(args).precompute_morphology_table()
+        return
+
+    if args.serve:
+        from gramatika.server import GramatikaServer
+
+        server = GramatikaServer(GramatikaDataset(args))
+        if args.socket:
+            server.serve_unix_socket(args.socket)
+        else:
+            server.serve_stdio()
+        return
+
     GramatikaDataset(args).generate_dataset()
 
 if __name__ == "__main__":
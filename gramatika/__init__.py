@@ -2,4 +2,7 @@ version = '0.0.1'
 
 from .gramatika_main import (
     GramatikaDataset,
+)
+from .export import (
+    RecordReader,
 )
\ No newline at end of file
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+
+import hashlib
+import json
+import os
+
+
+# Version of saved cache format. It has to be increased whenever tokens or error candidates
+# made for the same sentence change (ex. a change in error generators), so old cache files are not used
+CACHE_FORMAT_VERSION = 1
+
+
+class SentenceCache():
+
+    # Keeps the deterministic part of Sentence construction (token list and error candidates)
+    # keyed by sentence content, so repeated sentences go straight to sampling of errors.
+    # Cache file only holds plain data (JSON) of error candidates, tokens of loaded entries
+    # are made again from the sentence when it is first seen
+
+    def __init__(self, max_size, cache_file=None, tesaurus=None, error_type_ids=None):
+        self.max_size = max_size
+        self.cache_file = cache_file
+        self.tesaurus = tesaurus
+        self.error_type_ids = sorted(error_type_ids) if error_type_ids is not None else None
+
+        self.__entries = OrderedDict()
+
+        self.total_hit = 0
+        self.total_lookup = 0
+
+    @staticmethod
+    def get_key(sentence_conll):
+        # Only fields used by Sentence are part of the key (ex. sentence comments are not)
+        content = repr([
+            (
+                token["id"],
+                token["form"],
+                token["lemma"],
+                token["upos"],
+                token["feats"],
+                token["head"],
+                token["deprel"],
+                token["misc"].get("Morf") if token["misc"] else None,
+                token["misc"].get("SpaceAfter") if token["misc"] else None,
+            )
+            for token in sentence_conll
+        ])
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key):
+        self.total_lookup += 1
+
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.total_hit += 1
+            self.__entries.move_to_end(key)
+
+        return entry
+
+    def put(self, key, entry):
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+
+        # Remove least recently used entries
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def get_hit_rate(self):
+        return self.total_hit / self.total_lookup if self.total_lookup > 0 else 0
+
+    def get_tesaurus_fingerprint(self):
+        # Error slots depend on thesaurus content, so saved cache is only valid for the same thesaurus
+        if self.tesaurus is None or not os.path.exists(self.tesaurus.get_filename()):
+            return None
+        return self.tesaurus.get_file_fingerprint(self.tesaurus.get_filename())
+
+    def get_header(self):
+        # Saved cache is only valid for the same format, thesaurus and error types
+        return {
+            "format" : CACHE_FORMAT_VERSION,
+            "tesaurus" : self.get_tesaurus_fingerprint(),
+            "error_type_ids" : self.error_type_ids,
+        }
+
+    @staticmethod
+    def candidate_to_data(candidate):
+        return [
+            candidate.error_type_id,
+            candidate.error_type,
+            candidate.original_token_id,
+            candidate.related_token_id,
+            candidate.alternatives,
+            candidate.weights,
+            candidate.probability,
+        ]
+
+    @staticmethod
+    def candidate_from_data(data):
+        from .error import ErrorCandidate
+
+        error_type_id, error_type, original_token_id, related_token_id, alternatives, weights, probability = data
+        return ErrorCandidate(
+            error_type_id=error_type_id,
+            error_type=error_type,
+            original_token_id=original_token_id,
+            related_token_id=related_token_id,
+            alternatives=alternatives,
+            weights=weights,
+            probability=probability,
+        )
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+
+        # Files which are not a cache of this version (ex. old pickled cache) are ignored
+        try:
+            with open(self.cache_file, encoding="utf-8") as cache_file:
+                cache_data = json.load(cache_file)
+        except ValueError:
+            return
+
+        if not isinstance(cache_data, dict) or cache_data.get("header") != self.get_header():
+            return
+
+        for key, error_type_ids, candidate_data_list in cache_data["entries"]:
+            self.put(bytes.fromhex(key), {
+                "token_list" : None,
+                "candidate_list" : [self.candidate_from_data(data) for data in candidate_data_list],
+                "error_type_ids" : set(error_type_ids),
+            })
+
+    def save(self):
+        if not self.cache_file:
+            return
+
+        with open(self.cache_file, "w", encoding="utf-8") as cache_file:
+            json.dump({
+                "header" : self.get_header(),
+                "entries" : [
+                    [
+                        key.hex(),
+                        sorted(entry["error_type_ids"]),
+                        [self.candidate_to_data(candidate) for candidate in entry["candidate_list"]],
+                    ]
+                    for key, entry in self.__entries.items()
+                ],
+            }, cache_file, ensure_ascii=False)
@@ -0,0 +1,110 @@
+import re
+
+
+# Minimal CoNLL-U reader which only builds the fields Gramatika uses
+# (id, form, lemma, upos, feats, head, deprel and misc), with the same values conllu.parse gives them.
+# Comments are skipped, and xpos and deps are not kept
+
+SPLIT_PATTERN = re.compile(r"\t| {2,}")
+
+
+def parse_conllu(text, fast_reader=False):
+    # Parse sentences of CoNLL-U text with the fast reader or with conllu package
+    if fast_reader:
+        return parse_fast(text)
+
+    from conllu import parse
+
+    return parse(text)
+
+
+def parse_fast(text):
+    sentence_list = []
+    token_list = None # None between sentences
+
+    # Sentences are separated by blank lines, same as conllu
+    for line in text.split("\n"):
+        line = line.strip()
+
+        if not line:
+            if token_list is not None:
+                sentence_list.append(token_list)
+                token_list = None
+            continue
+
+        if token_list is None:
+            token_list = []
+
+        if line[0] != "#":
+            token_list.append(parse_token_line(line))
+
+    if token_list is not None:
+        sentence_list.append(token_list)
+
+    return sentence_list
+
+
+def parse_token_line(line):
+    # Columns are separated by a tab or (as conllu allows) two or more spaces
+    if "  " in line:
+        columns = SPLIT_PATTERN.split(line)
+    else:
+        columns = line.split("\t")
+
+    if len(columns) < 10:
+        raise ValueError(f"Invalid line format, line must have 10 columns: {line}")
+
+    return {
+        "id" : parse_id(columns[0]),
+        "form" : columns[1],
+        "lemma" : columns[2],
+        "upos" : columns[3],
+        "feats" : parse_dict(columns[5]),
+        "head" : parse_head(columns[6]),
+        "deprel" : columns[7],
+        "misc" : parse_dict(columns[9]),
+    }
+
+
+def parse_id(value):
+    # 1 -> 1, multiword token range 1-2 -> (1, "-", 2), empty node 1.1 -> (1, ".", 1)
+    if value.isdigit():
+        return int(value)
+    elif value == "_" or not value:
+        return None
+    elif "-" in value:
+        start, end = value.split("-")
+        return (int(start), "-", int(end))
+    elif "." in value:
+        start, end = value.split(".")
+        return (int(start), ".", int(end))
+
+    raise ValueError(f"'{value}' is not a valid ID")
+
+
+def parse_head(value):
+    if value == "_":
+        return None
+    return int(value)
+
+
+def parse_dict(value):
+    # Key=Value|Key=Value, "_" is None. Same as conllu, value is the part between first and second "=",
+    # key without "=" has empty string value, and empty or "_" values are None
+    if not value or value == "_":
+        return None
+
+    result = {}
+    for part in value.split("|"):
+        key_value = part.split("=")
+        key = key_value[0]
+
+        if not key or key == "_":
+            continue
+
+        if len(key_value) > 1:
+            result[key] = key_value[1] if key_value[1] and key_value[1] != "_" else None
+        else:
+            result[key] = ""
+
+    return result
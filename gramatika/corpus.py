@@ -0,0 +1,226 @@
+import gzip
+import io
+import json
+import os
+
+
+# Size of read and write blocks, large blocks keep (de)compression throughput high
+BUFFER_SIZE = 1024 * 1024
+
+COMPRESSION_EXTENSIONS = (".gz", ".zst", ".zstd")
+
+
+def get_compression_extension(filename):
+    for extension in COMPRESSION_EXTENSIONS:
+        if filename.endswith(extension):
+            return extension
+    return ""
+
+
+def open_binary(filename, mode="rb"):
+    # Open file for binary reading ("rb") or writing ("wb"),
+    # transparently (de)compressed according to the file extension
+    extension = get_compression_extension(filename)
+
+    if extension == ".gz":
+        stream = gzip.GzipFile(filename, mode, compresslevel=6)
+    elif extension in (".zst", ".zstd"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard package is required to read or write .zst files")
+
+        if mode == "rb":
+            stream = zstandard.ZstdDecompressor().stream_reader(open(filename, "rb"), closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(open(filename, "wb"), closefd=True)
+    else:
+        return open(filename, mode, buffering=BUFFER_SIZE)
+
+    if mode == "rb":
+        return io.BufferedReader(stream, buffer_size=BUFFER_SIZE)
+    return io.BufferedWriter(stream, buffer_size=BUFFER_SIZE)
+
+
+def open_text(filename, mode="r"):
+    # Open file for ascii text reading ("r") or writing ("w"),
+    # transparently (de)compressed according to the file extension
+    if mode == "r":
+        return io.TextIOWrapper(open_binary(filename, "rb"), encoding="ascii", errors="ignore")
+    return io.TextIOWrapper(open_binary(filename, "wb"), encoding="ascii")
+
+
+def decode_text(data):
+    # Decode the same way as reading the file in text mode
+    with io.TextIOWrapper(io.BytesIO(data), encoding="ascii", errors="ignore") as text_input:
+        return text_input.read()
+
+
+def skip_to(file_input, position):
+    # Move freshly opened file_input forward to position.
+    # Compressed streams may not be seekable, then the skipped part is read and discarded
+    if file_input.seekable():
+        file_input.seek(position)
+        return
+
+    while position > 0:
+        data = file_input.read(min(position, BUFFER_SIZE))
+        if not data:
+            break
+        position -= len(data)
+
+
+class CorpusReader():
+
+    def __init__(self, input_filename, shard_index=0, shard_count=1, offset_index_file=None):
+        self.input_filename = input_filename
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.offset_index_file = offset_index_file
+
+    def get_file_size(self):
+        # Only used for uncompressed input, compressed input is split with an offset index
+        return os.path.getsize(self.input_filename)
+
+    def get_sentence_boundary(self, file_input, position):
+        # Get the first sentence start at or after position.
+        # A sentence starts right after a blank line, so finish the line
+        # containing position - 1 and then read until a blank line is found
+        if position <= 0:
+            return 0
+
+        skip_to(file_input, position - 1)
+        position = position - 1 + len(file_input.readline())
+
+        while True:
+            line = file_input.readline()
+            position += len(line)
+            if not line or line.strip() == b"":
+                return position
+
+    def build_offset_index(self):
+        # Byte offset of every sentence start in the input file, and size of (decompressed) input
+        offsets = []
+        position = 0
+        in_sentence = False
+
+        with open_binary(self.input_filename) as file_input:
+            for line in file_input:
+                if line.strip() == b"":
+                    in_sentence = False
+                elif not in_sentence:
+                    offsets.append(position)
+                    in_sentence = True
+                position += len(line)
+
+        return offsets, position
+
+    def get_offset_index_filename(self):
+        # Compressed input is always split with an offset index, saved next to it if no file is given.
+        # Otherwise every shard would decompress the whole input to find its size and boundaries
+        if self.offset_index_file:
+            return self.offset_index_file
+        if get_compression_extension(self.input_filename):
+            return self.input_filename + ".offsets.json"
+        return None
+
+    def get_offset_index(self):
+        # Get offsets of sentence starts and size of input, built once and reused by every shard
+        offset_index_filename = self.get_offset_index_filename()
+        stat = os.stat(self.input_filename)
+
+        if os.path.exists(offset_index_filename):
+            with open(offset_index_filename) as index_file:
+                offset_index = json.load(index_file)
+
+            # Only reuse the index if the input file has not changed since it was built
+            if offset_index["size"] == stat.st_size and offset_index["mtime"] == stat.st_mtime and "data_size" in offset_index:
+                return offset_index["offsets"], offset_index["data_size"]
+
+        offsets, data_size = self.build_offset_index()
+
+        # Shards may build the index at the same time, the file is replaced as a whole
+        temporary_filename = f"{offset_index_filename}.{os.getpid()}.tmp"
+        with open(temporary_filename, "w") as index_file:
+            json.dump({
+                "size" : stat.st_size,
+                "mtime" : stat.st_mtime,
+                "data_size" : data_size,
+                "offsets" : offsets,
+            }, index_file)
+        os.replace(temporary_filename, offset_index_filename)
+
+        return offsets, data_size
+
+    def get_shard_range(self):
+        if self.get_offset_index_filename():
+            # Exact split: every shard gets the same number of sentences
+            offsets, data_size = self.get_offset_index()
+            if self.shard_count <= 1:
+                return 0, data_size
+
+            total = len(offsets)
+            first = total * self.shard_index // self.shard_count
+            last = total * (self.shard_index + 1) // self.shard_count
+
+            start = offsets[first] if first < total else data_size
+            end = offsets[last] if last < total else data_size
+            return start, end
+
+        file_size = self.get_file_size()
+
+        if self.shard_count <= 1:
+            return 0, file_size
+
+        # Approximate split: every shard gets the same number of bytes,
+        # moved forward to the next sentence boundary
+        with open_binary(self.input_filename) as file_input:
+            start = self.get_sentence_boundary(file_input, file_size * self.shard_index // self.shard_count)
+        with open_binary(self.input_filename) as file_input:
+            end = self.get_sentence_boundary(file_input, file_size * (self.shard_index + 1) // self.shard_count)
+
+        return start, end
+
+    def iter_chunks(self, chunk_size):
+        # Read input (only the slice of this shard) as text chunks of chunk_size sentences,
+        # without reading the whole input into memory
+        if self.shard_count <= 1:
+            start, end = 0, None
+        else:
+            start, end = self.get_shard_range()
+
+        with open_binary(self.input_filename) as file_input:
+            skip_to(file_input, start)
+            position = start
+
+            lines = []
+            total_sentence = 0
+            in_sentence = False
+
+            while end is None or position < end:
+                line = file_input.readline()
+                if not line:
+                    break
+                position += len(line)
+                lines.append(line)
+
+                if line.strip() == b"":
+                    if in_sentence:
+                        total_sentence += 1
+                    in_sentence = False
+
+                    if total_sentence == chunk_size:
+                        yield decode_text(b"".join(lines))
+                        lines = []
+                        total_sentence = 0
+                else:
+                    in_sentence = True
+
+            if lines:
+                yield decode_text(b"".join(lines))
+
+    def get_shard_total_sentence(self, total_sentence):
+        # Split total_sentence quota between shards, so that the sum of all shards is total_sentence
+        first = total_sentence * self.shard_index // self.shard_count
+        last = total_sentence * (self.shard_index + 1) // self.shard_count
+        return last - first
@@ -1,11 +1,32 @@
 
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 import string
 import random
 import re
 
 
+# Maximum number of distinct tokens whose error forms are memoized by each morphological error type
+TRANSFORM_CACHE_SIZE = 65536
+
+
+class ErrorCandidate():
+
+    # An error which can be made in a sentence, as plain data and without any random choice (phase one).
+    # alternatives are the error token lists it can be made into, chosen by weights (uniformly if None),
+    # and it is only made with the given probability (phase two, Error.sample)
+
+    def __init__(self, error_type_id, error_type, original_token_id, related_token_id, alternatives, weights=None, probability=1):
+        self.error_type_id = error_type_id
+        self.error_type = error_type
+        self.original_token_id = original_token_id
+        self.related_token_id = related_token_id
+        self.alternatives = alternatives
+        self.weights = weights
+        self.probability = probability
+
+
 class Error(ABC):
 
     konsonan_luluh = ['k', 't', 's', 'p']
@@ -14,22 +35,57 @@ class Error(ABC):
     error_type: str
     max_ratio: float
 
-    def __init__(self, token, sentence):
+    def __init__(self, candidate, sentence, error_token_list):
         super().__init__()
-        self.token = token
+        self.candidate = candidate
         self.sentence = sentence
 
-        self.error_type = ""
-        self.original_token_list = []
-        self.error_token_list = []
-        self.related_token_id = []
-
-        self.generate_error()
+        self.error_type = candidate.error_type
+        self.original_token_list = [sentence.get_token_by_id(token_id) for token_id in candidate.original_token_id]
+        self.error_token_list = error_token_list
+        self.related_token_id = candidate.related_token_id
 
+    @classmethod
     @abstractmethod
-    def generate_error(self):
+    def get_candidate(cls, token, sentence):
+        # Return ErrorCandidate if error can be made on token, otherwise None.
+        # Must not use random, so candidates of a sentence can be reused
         pass
 
+    @classmethod
+    def create_candidate(cls, original_token_list, alternatives, error_type, related_token_id, weights=None, probability=1):
+        return ErrorCandidate(
+            error_type_id=cls.error_type_id,
+            error_type=error_type,
+            original_token_id=[token.id for token in original_token_list],
+            related_token_id=related_token_id,
+            alternatives=alternatives,
+            weights=weights,
+            probability=probability,
+        )
+
+    @classmethod
+    def sample(cls, candidate, sentence):
+        # Make error from candidate by random choice, None if it is not made
+        if candidate.probability < 1 and random.random() >= candidate.probability:
+            return None
+
+        return cls.make(candidate, sentence)
+
+    @classmethod
+    def make(cls, candidate, sentence):
+        # Make error from candidate which is already chosen to be made
+        return cls(candidate, sentence, cls.sample_alternative(candidate, sentence))
+
+    @classmethod
+    def sample_alternative(cls, candidate, sentence):
+        if len(candidate.alternatives) == 1:
+            return candidate.alternatives[0]
+        elif candidate.weights is None:
+            return random.choice(candidate.alternatives)
+        else:
+            return random.choices(candidate.alternatives, weights=candidate.weights)[0]
+
     def is_valid(self):
         # Is error valid or not (is error generated correctly)
         return self.error_type and len(self.original_token_list) and len(self.error_token_list)
@@ -55,14 +111,13 @@ class Error(ABC):
         return self.get_len_error_token_list() - self.get_len_original_token_list()
 
     def get_ratio(self):
-        dataset = self.sentence.dataset
-        total_error_on_dataset = dataset.get_total_error()
+        return self.sentence.dataset.get_error_type_ratio(self.error_type_id)
+
+    @classmethod
+    def get_transform_cache_info(cls):
+        # Hits and misses of memoized token transform of error type, None if it has none
+        return None
 
-        if total_error_on_dataset > 0:
-            return dataset.error_dict[self.error_type_id]["count"] / total_error_on_dataset
-        else:
-            return 0
-        
     def is_below_max_ratio(self):
         return self.get_ratio() < self.max_ratio
 
@@ -72,21 +127,21 @@ class AdjectiveError(Error):
     error_type_id = "ADJ"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
+    @classmethod
+    def get_candidate(cls, token, sentence):
+        if token.upos != 'ADJ':
+            return None
 
-        sinonims = sentence.dataset.get_sinonim(token.form)
+        # Synonyms are already split into tokens
+        sinonims = sentence.dataset.get_sinonim_tokens(token.form, 'ADJ')
 
-        if token.upos == 'ADJ' and len(sinonims) > 0:
-            self.original_token_list = [token]
-            self.error_token_list = random.choice(sinonims).split(" ")
-
-            self.error_type = "|||R:ADJ|||"
-            self.related_token_id = [token.id]
+        if len(sinonims) > 0:
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=sinonims,
+                error_type="|||R:ADJ|||",
+                related_token_id=[token.id],
+            )
 
 
 class AdverbError(Error):
@@ -96,37 +151,39 @@ class AdverbError(Error):
 
     adp_for_Adverb = ['secara', 'dengan']
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         token_id_after = token.id + 1
         token_after = None
         if sentence.does_token_id_exists(token_id_after):
             token_after = sentence.get_token_by_id(token_id_after)
 
-        sinonims = sentence.dataset.get_sinonim(token.form)
-
-        if token.upos == 'ADV' and len(sinonims) > 0:
-            self.original_token_list = [token]
-            self.error_token_list = random.choice(sinonims).split(" ")
-
-            self.error_type = "|||R:ADV|||"
-
-        elif token.upos == 'ADP' and token_after is not None and token_after.upos == 'ADJ' and token.form.lower() in self.adp_for_Adverb:
-            self.original_token_list = [token]
-            self.error_token_list = [""]
-
-            self.error_type = "|||M:ADV|||"
-
         # Either way (of if condition), token_after will be considered related
         if token_after:
-            self.related_token_id = [token.id, token_after.id]
+            related_token_id = [token.id, token_after.id]
         else:
-            self.related_token_id = [token.id]
+            related_token_id = [token.id]
+
+        if token.upos == 'ADV':
+            sinonims = sentence.dataset.get_sinonim_tokens(token.form, 'ADV')
+        else:
+            sinonims = ()
+
+        if len(sinonims) > 0:
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=sinonims,
+                error_type="|||R:ADV|||",
+                related_token_id=related_token_id,
+            )
+
+        elif token.upos == 'ADP' and token_after is not None and token_after.upos == 'ADJ' and token.form.lower() in cls.adp_for_Adverb:
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[[""]],
+                error_type="|||M:ADV|||",
+                related_token_id=related_token_id,
+            )
 
 
 class ConjunctionError(Error):
@@ -232,27 +289,25 @@ class ConjunctionError(Error):
     error_type_id = "CONJ"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         token_form_lower = token.form.lower()
 
-        if len(self.list_conjunction_error_substitution.get(token_form_lower, [])) > 0:
-            self.original_token_list = [token]
-            self.error_token_list = random.choice(self.list_conjunction_error_substitution[token_form_lower]).split(" ")
-
-            self.error_type = "|||R:CONJ|||"
-            self.related_token_id = [token.id]
+        if len(cls.list_conjunction_error_substitution.get(token_form_lower, [])) > 0:
+            related_token_id = [token.id]
 
-            # Token After (if there is any) will be added to related_token 
+            # Token After (if there is any) will be added to related_token
             token_id_after = token.id + 1
             if sentence.does_token_id_exists(token_id_after):
                 token_after = sentence.get_token_by_id(token_id_after)
-                self.related_token_id = [token.id, token_after.id]
+                related_token_id = [token.id, token_after.id]
+
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[conjunction.split(" ") for conjunction in cls.list_conjunction_error_substitution[token_form_lower]],
+                error_type="|||R:CONJ|||",
+                related_token_id=related_token_id,
+            )
 
 
 
@@ -264,26 +319,24 @@ class DeterminerError(Error):
     penggolong_word_list = ['orang', 'ekor', 'buah', 'batang' , 'bentuk', 'bidang' , 'belah', 'helai', 'bilah', 'utas', 'potong', 'tangkai', 'butir', 'pucuk', 'carik', 'rumpun', 'keping', 'biji', 'kuntum', 'patah', 'laras', 'kerat']
     penggolong_subtitution_choices = ['orang', 'ekor', 'buah', 'batang' , 'bentuk', 'bidang' , 'belah', 'helai', 'bilah', 'utas', 'potong', 'tangkai', 'butir', 'pucuk', 'carik', 'rumpun', 'keping', 'biji', 'kuntum', 'patah']
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
+    @classmethod
+    def get_candidate(cls, token, sentence):
+        if token.upos == 'DET' and token.lemma in cls.penggolong_word_list:
+            related_token_id = [token.id]
 
-        if token.upos == 'DET' and token.lemma in self.penggolong_word_list:
-            self.original_token_list = [token]
-            self.error_token_list = token.form.replace(token.lemma, random.choice([penggolong for penggolong in self.penggolong_subtitution_choices if penggolong != token.lemma])).split(" ")
-
-            self.error_type = "|||R:DET|||"
-            self.related_token_id = [token.id]
-
-            # Token After (if there is any) will be added to related_token 
+            # Token After (if there is any) will be added to related_token
             token_id_after = token.id + 1
             if sentence.does_token_id_exists(token_id_after):
                 token_after = sentence.get_token_by_id(token_id_after)
-                self.related_token_id = [token.id, token_after.id]
-                
+                related_token_id = [token.id, token_after.id]
+
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[token.form.replace(token.lemma, penggolong).split(" ") for penggolong in cls.penggolong_subtitution_choices if penggolong != token.lemma],
+                error_type="|||R:DET|||",
+                related_token_id=related_token_id,
+            )
+
 
 
 class MorphologyError(Error):
@@ -293,52 +346,60 @@ class MorphologyError(Error):
     error_type_id = "MORPH"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
+    @classmethod
+    def is_meN_verb(cls, token):
+        # Verb with only meN- prefix, its nominalization is looked up in thesaurus
+        return cls.get_verb_prefix(token.upos, token.morf) == "meN"
+
+    @classmethod
+    def get_verb_prefix(cls, upos, morf):
+        # "meN" or "ber" if token is a verb with only that prefix, otherwise None
+        token_morf_plus_sign = "+".join(morf)
+        if upos == 'VERB' and token_morf_plus_sign.count('+') == 1:
+            if token_morf_plus_sign.count('meN+') == 1:
+                return "meN"
+            elif token_morf_plus_sign.count('ber+') == 1:
+                return "ber"
+        return None
+
+    @classmethod
+    @lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+    def get_morphology_alternatives(cls, upos, lemma, morf, is_before_nominal, tesaurus):
+        # Alternatives of MORPH candidate, None if there is none. Nominalization of meN- verb is looked up
+        # in tesaurus (a key, so datasets with different thesauri do not share results)
+        verb_prefix = cls.get_verb_prefix(upos, morf)
+
+        if verb_prefix == "meN" and is_before_nominal:
+            return (tuple(tesaurus.get_morphology_target(lemma).split(" ")),)
+        elif verb_prefix == "ber" and not is_before_nominal:
+            return (tuple(("per" + lemma + "an").split(" ")),)
+
+        return None
+
+    @classmethod
+    def get_transform_cache_info(cls):
+        return cls.get_morphology_alternatives.cache_info()
+
+    @classmethod
+    def get_candidate(cls, token, sentence):
+        if token.upos != 'VERB':
+            return None
 
         token_id_after = token.id + 1
         token_after = None
         if sentence.does_token_id_exists(token_id_after):
             token_after = sentence.get_token_by_id(token_id_after)
 
-        token_morf_plus_sign = "+".join(token.morf)
-        if (
-            (
-                token.upos == 'VERB' 
-                and token_morf_plus_sign.count('meN+') == 1 
-                and token_morf_plus_sign.count('+') == 1
-            )
-            and
-            (
-                token_after is not None and token_after.deprel in self.deprel_nominals
-            )
-        ):
-            self.original_token_list = [token]
-            self.error_token_list = sentence.dataset.get_most_similar("pe" + token.lemma + 'an').split(" ")
-            
-            self.error_type = "|||R:MORPH|||"
-            self.related_token_id = [token.id]
-
-        elif (
-            (
-                token.upos == 'VERB' 
-                and token_morf_plus_sign.count('ber+') == 1 
-                and token_morf_plus_sign.count('+') == 1
-            )
-            and not
-            (
-                token_after is not None and token_after.deprel in self.deprel_nominals
+        is_before_nominal = token_after is not None and token_after.deprel in cls.deprel_nominals
+        alternatives = cls.get_morphology_alternatives(token.upos, token.lemma, token.morf, is_before_nominal, sentence.dataset.get_sinonim_dict())
+
+        if alternatives is not None:
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=alternatives,
+                error_type="|||R:MORPH|||",
+                related_token_id=[token.id],
             )
-        ):
-            self.original_token_list = [token]
-            self.error_token_list = ("per" + token.lemma + "an").split(" ")
-            
-            self.error_type = "|||R:MORPH|||"
-            self.related_token_id = [token.id]
 
 
 class NounError(Error):
@@ -346,25 +407,21 @@ class NounError(Error):
     error_type_id = "NOUN"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         if token.upos == 'NOUN':
 
-            # Get synonym of token form
-            sinonims = sentence.dataset.get_sinonim(token.form)
+            # Get synonym of token form, already split into tokens
+            sinonims = sentence.dataset.get_sinonim_tokens(token.form, 'NOUN')
 
             # Only add error if there is sinonims
             if len(sinonims) > 0:
-                self.original_token_list = [token]
-                self.error_token_list = random.choice(sinonims).split(" ")
-
-                self.error_type = "|||R:NOUN|||"
-                self.related_token_id = [token.id]
+                return cls.create_candidate(
+                    original_token_list=[token],
+                    alternatives=sinonims,
+                    error_type="|||R:NOUN|||",
+                    related_token_id=[token.id],
+                )
 
 
 class NounInflectionError(Error):
@@ -372,42 +429,49 @@ class NounInflectionError(Error):
     error_type_id = "NOUN:INFL"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-    
-        token = self.token
-        
+    @classmethod
+    def get_candidate(cls, token, sentence):
         if (token.upos=='NOUN' and (token.morf.count('peN') == 1 or token.morf.count('pe') == 1 or token.morf.count('per') == 1)):
-            
-            prefix = ""
-
-            if token.form[:3].lower() == "per":
-                prefix = random.choice(["pen", "pe"])
-            elif token.form[:3].lower() == "pen":
-                prefix = random.choice(["per", "pe"])
-            elif token.form[:4].lower() == "peng":
-                prefix = random.choice(["per", "pen", "pe"])
-            elif token.form[:3].lower() == "pem":
-                prefix = "pe"
-            elif token.form[:4].lower() == "peny":
-                prefix = "pen"
-            
-            ubah_kata = prefix + token.lemma
-
-            if prefix:
-                if token.morf.count('an') == 1:
-                    if token.lemma[-1] == "a":
-                        ubah_kata = ubah_kata + "n"
-                    else :
-                        ubah_kata = ubah_kata + "an"
-            
-                self.original_token_list = [token]
-                self.error_token_list = ubah_kata.split(" ")
+            error_forms = cls.get_error_forms(token.form[:4].lower(), token.lemma, token.morf)
+
+            if error_forms:
+                return cls.create_candidate(
+                    original_token_list=[token],
+                    alternatives=[list(error_form) for error_form in error_forms],
+                    error_type="|||R:NOUN:INFL|||",
+                    related_token_id=[token.id],
+                )
+
+    @classmethod
+    @lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+    def get_error_forms(cls, form_prefix, lemma, morf):
+        # Error forms (as tuples of tokens) of noun with peN-, pe- or per- prefix,
+        # form_prefix is the first 4 characters of lowercased form
+        prefix_choices = []
+
+        if form_prefix[:3] == "per":
+            prefix_choices = ["pen", "pe"]
+        elif form_prefix[:3] == "pen":
+            prefix_choices = ["per", "pe"]
+        elif form_prefix[:4] == "peng":
+            prefix_choices = ["per", "pen", "pe"]
+        elif form_prefix[:3] == "pem":
+            prefix_choices = ["pe"]
+        elif form_prefix[:4] == "peny":
+            prefix_choices = ["pen"]
+
+        suffix = ""
+        if morf.count('an') == 1:
+            if lemma[-1] == "a":
+                suffix = "n"
+            else :
+                suffix = "an"
 
-                self.error_type = "|||R:NOUN:INFL|||"
-                self.related_token_id = [token.id]
+        return tuple(tuple((prefix + lemma + suffix).split(" ")) for prefix in prefix_choices)
+
+    @classmethod
+    def get_transform_cache_info(cls):
+        return cls.get_error_forms.cache_info()
 
 
 
@@ -422,17 +486,12 @@ class OrthographyError(Error):
     orth_suffix_types = ["nya", "lah", "pun", "kah"]
     orthography_types = orth_prefix_types + orth_suffix_types
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         # Whitespace is missing error
-        if token.form.lower() in self.orthography_types:
+        if token.form.lower() in cls.orthography_types:
             # Prefix
-            if token.form.lower() in self.orth_prefix_types:
+            if token.form.lower() in cls.orth_prefix_types:
                 token_id_after = token.id + 1
 
                 if sentence.does_token_id_exists(token_id_after):
@@ -442,53 +501,54 @@ class OrthographyError(Error):
                     # If capitalized, usually is a place name, etc. which is unlikely in errors
                     # Ex. error sentence: "Saya pergi keJakarta" seldom appears
                     if not token_after.form[0].isupper():
-                        self.original_token_list = [token, token_after]
-                        self.error_token_list = [token.form + token_after.form]
-
-                        self.error_type = "|||R:ORTH|||"
-                        self.related_token_id = [token.id, token_after.id]
+                        return cls.create_candidate(
+                            original_token_list=[token, token_after],
+                            alternatives=[[token.form + token_after.form]],
+                            error_type="|||R:ORTH|||",
+                            related_token_id=[token.id, token_after.id],
+                        )
 
-            elif token.form.lower() in self.orth_suffix_types:
+            elif token.form.lower() in cls.orth_suffix_types:
                 token_id_before = token.id - 1
 
                 if sentence.does_token_id_exists(token_id_before):
                     token_before = sentence.get_token_by_id(token_id_before)
 
-                    self.original_token_list = [token_before, token]
-                    self.error_token_list = [token_before.form + token.form]
+                    return cls.create_candidate(
+                        original_token_list=[token_before, token],
+                        alternatives=[[token_before.form + token.form]],
+                        error_type="|||R:ORTH|||",
+                        related_token_id=[token_before.id, token.id],
+                    )
 
-                    self.error_type = "|||R:ORTH|||"
-                    self.related_token_id = [token_before.id, token.id]
-        
         # Whitespace is unnecessary error
         else:
 
-            for prefix in self.orthography_types:
+            for prefix in cls.orthography_types:
                 if token.morf[0].lower() == prefix.lower():
 
                     # case of ke-[numeric]
                     if token.form[:3] == "ke-" and token.form[3:].isdigit():
-                        self.original_token_list = [token]
-                        self.error_token_list = token.form.split("-")
+                        error_token_list = token.form.split("-")
                     elif not token.upos == "NOUN":
-                        self.original_token_list = [token]
-                        self.error_token_list = [token.form[:len(prefix)], token.form[len(prefix):]]
+                        error_token_list = [token.form[:len(prefix)], token.form[len(prefix):]]
                     else:
                         continue
 
-                    self.error_type = "|||R:ORTH|||"
-                    self.related_token_id = [token.id]
-
-                    break
+                    return cls.create_candidate(
+                        original_token_list=[token],
+                        alternatives=[error_token_list],
+                        error_type="|||R:ORTH|||",
+                        related_token_id=[token.id],
+                    )
                 # Suffix
                 elif token.morf[-1].lower() == prefix.lower():
-                    self.original_token_list = [token]
-                    self.error_token_list = [token.form[:-len(prefix)], token.form[-len(prefix):]]
-                    
-                    self.error_type = "|||R:ORTH|||"
-                    self.related_token_id = [token.id]
-
-                    break
+                    return cls.create_candidate(
+                        original_token_list=[token],
+                        alternatives=[[token.form[:-len(prefix)], token.form[-len(prefix):]]],
+                        error_type="|||R:ORTH|||",
+                        related_token_id=[token.id],
+                    )
 
 
 class ParticleError(Error):
@@ -498,36 +558,32 @@ class ParticleError(Error):
     error_type_id = "PART"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        
+    @classmethod
+    def get_candidate(cls, token, sentence):
         # If particle is by itself (not as suffix)
-        if token.upos in ["PART"] and token.form.lower() in self.particle_list:
-            self.original_token_list = [token]
+        if token.upos in ["PART"] and token.form.lower() in cls.particle_list:
+            particle_substitution_choices = [particle for particle in cls.particle_list if particle != token.form.lower()]
+
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[particle.split(" ") for particle in particle_substitution_choices],
+                error_type="|||R:PART|||",
+                related_token_id=[token.id],
+            )
 
-            particle_substitution_choices = list(set(self.particle_list) - set([token.form.lower()]))
-            self.error_token_list = random.choice(particle_substitution_choices).split(" ")
-            
-            self.error_type = "|||R:PART|||"
-            self.related_token_id = [token.id]
-        
         # If particle is suffix of a token
-        elif token.morf[-1].lower() in self.particle_list:
-            self.original_token_list = [token]
-
+        elif token.morf[-1].lower() in cls.particle_list:
             original_particle = token.morf[-1].lower()
             original_without_particle = token.form[:-len(original_particle)]
 
-            particle_substitution_choices = list(set(self.particle_list) - set([original_particle]))
-            particle_error_chosen = random.choice(particle_substitution_choices)
-
-            self.error_token_list = [original_without_particle + particle_error_chosen]
+            particle_substitution_choices = [particle for particle in cls.particle_list if particle != original_particle]
 
-            self.error_type = "|||R:PART|||"
-            self.related_token_id = [token.id]
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[[original_without_particle + particle] for particle in particle_substitution_choices],
+                error_type="|||R:PART|||",
+                related_token_id=[token.id],
+            )
 
 
 
@@ -566,31 +622,29 @@ class PrepositionError(Error):
     error_type_id = "PREP"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         token_form_lower = token.form.lower()
 
         if (
-            (token.upos in ["ADP"] or token_form_lower in self.always_treat_as_ADP_list) 
-            and token_form_lower in self.dict_prepositions_errors 
-            and len(self.dict_prepositions_errors[token_form_lower]) > 0
+            (token.upos in ["ADP"] or token_form_lower in cls.always_treat_as_ADP_list)
+            and token_form_lower in cls.dict_prepositions_errors
+            and len(cls.dict_prepositions_errors[token_form_lower]) > 0
         ):
-            self.original_token_list = [token]
-            self.error_token_list = random.choice(self.dict_prepositions_errors[token_form_lower]).split(" ")
+            related_token_id = [token.id]
 
-            self.error_type = "|||R:PREP|||"
-            self.related_token_id = [token.id]
-
-            # Token After (if there is any) will be added to related_token 
+            # Token After (if there is any) will be added to related_token
             token_id_after = token.id + 1
             if sentence.does_token_id_exists(token_id_after):
                 token_after = sentence.get_token_by_id(token_id_after)
-                self.related_token_id = [token.id, token_after.id]
+                related_token_id = [token.id, token_after.id]
+
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[preposition.split(" ") for preposition in cls.dict_prepositions_errors[token_form_lower]],
+                error_type="|||R:PREP|||",
+                related_token_id=related_token_id,
+            )
 
 
 class PronounError(Error):
@@ -642,38 +696,48 @@ class PronounError(Error):
     list_all_persona_pronoun = list(persona_pronoun_errors.values())
     list_all_persona_pronoun = [item for sublist in list_all_persona_pronoun for item in sublist]
     
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-
-        if (token.upos == 'PRON' and token.form in self.list_all_persona_pronoun):
-            self.error_token_list = random.choice(random.choice([value for key, value in self.persona_pronoun_errors.items() if key not in self.list_blacklist_persona_pronoun(token.form)])).split(" ")
-            self.original_token_list = [token]
-
-            self.error_type = "|||R:PRON|||"
-            self.related_token_id = [token.id]
+    @classmethod
+    def get_candidate(cls, token, sentence):
+        if (token.upos == 'PRON' and token.form in cls.list_all_persona_pronoun):
+            # Pronoun group is chosen first, then pronoun in it,
+            # so each pronoun is weighted by the size of its group
+            alternatives = []
+            weights = []
+            for key, value in cls.persona_pronoun_errors.items():
+                if key not in cls.list_blacklist_persona_pronoun(token.form):
+                    alternatives.extend([pronoun.split(" ") for pronoun in value])
+                    weights.extend([1 / len(value)] * len(value))
+
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=alternatives,
+                error_type="|||R:PRON|||",
+                related_token_id=[token.id],
+                weights=weights,
+            )
 
-        elif (token.upos == 'PRON' and token.form in self.pronomina_penanya):
+        elif (token.upos == 'PRON' and token.form in cls.pronomina_penanya):
 
             if token.form == "mengapa" or token.form == "kenapa" :
-                tmp_pronomina_penanya = self.pronomina_penanya.copy()
+                tmp_pronomina_penanya = cls.pronomina_penanya.copy()
                 tmp_pronomina_penanya.pop(tmp_pronomina_penanya.index("mengapa"))
                 tmp_pronomina_penanya.pop(tmp_pronomina_penanya.index("kenapa"))
-                self.error_token_list = token.form.replace(token.lemma, random.choice(tmp_pronomina_penanya)).split(" ")
+                alternatives = [token.form.replace(token.lemma, pronoun).split(" ") for pronoun in tmp_pronomina_penanya]
             else:
-                tmp_pronomina_penanya = self.pronomina_penanya.copy()
+                tmp_pronomina_penanya = cls.pronomina_penanya.copy()
                 tmp_pronomina_penanya.pop(tmp_pronomina_penanya.index(token.lemma))
-                self.error_token_list = random.choice(tmp_pronomina_penanya).split(" ")
+                alternatives = [pronoun.split(" ") for pronoun in tmp_pronomina_penanya]
 
-            self.original_token_list = [token]
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=alternatives,
+                error_type="|||R:PRON|||",
+                related_token_id=[token.id],
+            )
 
-            self.error_type = "|||R:PRON|||"
-            self.related_token_id = [token.id]
-    
-    def list_blacklist_persona_pronoun(self, kata):
-        for key,value in self.persona_pronoun_errors.items():
+    @classmethod
+    def list_blacklist_persona_pronoun(cls, kata):
+        for key,value in cls.persona_pronoun_errors.items():
             if kata in value:
                 return [key]
         return []
@@ -684,13 +748,8 @@ class PunctuationError(Error):
     error_type_id = "PUNCT"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        
-        token = self.token
-        sentence = self.sentence
+    @classmethod
+    def get_candidate(cls, token, sentence):
         ada_Anak_Kalimat = 0
         ada_Kalimat_tambahan = 0
         
@@ -706,37 +765,39 @@ class PunctuationError(Error):
             token_after = sentence.get_token_by_id(token_id_after)
 
         if (token.upos == 'PUNCT' and token.lemma == "," and token_after != None  and token_after.upos=='CCONJ' and token_after.lemma in {"dan","atau","tetapi","melainkan","sedangkan"}):
-            self.original_token_list = [token]
-            self.error_token_list = [""]
-
-            self.error_type = "|||M:PUNCT|||"
-            self.related_token_id = [token.id]
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[[""]],
+                error_type="|||M:PUNCT|||",
+                related_token_id=[token.id],
+            )
 
-        elif ((ada_Anak_Kalimat == 1 or ada_Kalimat_tambahan == 1) and token.lemma == ","): 
-            self.original_token_list = [token]
-            self.error_token_list = [""]
+        elif ((ada_Anak_Kalimat == 1 or ada_Kalimat_tambahan == 1) and token.lemma == ","):
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[[""]],
+                error_type="|||M:PUNCT|||",
+                related_token_id=[token.id],
+            )
 
-            self.error_type = "|||M:PUNCT|||"
-            self.related_token_id = [token.id]
-        
         elif token.upos == 'PUNCT' and token.lemma in ["?", "!"]:
-            self.original_token_list = [token]
-            self.error_token_list = ["."]
-
-            self.error_type = "|||R:PUNCT|||"
-            self.related_token_id = [token.id]
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[["."]],
+                error_type="|||R:PUNCT|||",
+                related_token_id=[token.id],
+            )
 
         elif token.upos == 'PUNCT' and token.lemma == ".":
-            # Do this 1 in 50 occurence of ".",
+            # Do this 1 in 29 occurence of ".",
             # So PUNCT error will not be saturated by this kind of error
-            if random.randrange(1, 30) == 1:
-                self.original_token_list = [token]
-                self.error_token_list = [""]
-
-                self.error_type = "|||M:PUNCT|||"
-                self.related_token_id = [token.id]
-            
-       
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=[[""]],
+                error_type="|||M:PUNCT|||",
+                related_token_id=[token.id],
+                probability=1 / 29,
+            )
 
 
 class SpellingError(Error): #Membuat spelling error
@@ -744,57 +805,51 @@ class SpellingError(Error): #Membuat spelling error
     error_type_id = "SPELL"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
+    # Spelling errors are made by one of these operations on a random position,
+    # so alternatives of the candidate are the operation names
+    spelling_operations = ["erase", "add", "swap", "remove_vowel"]
 
-    def generate_error(self):
-        token = self.token
-        
+    @classmethod
+    def get_candidate(cls, token, sentence):
         if token.form.isalpha() and len(token.form) > 3:
-            rand = random.randrange(1, 5)
-            apakah_akan_dilakukan = random.randrange(1, 40)
-
-            if apakah_akan_dilakukan == 1 and rand == 1: ## Erase one char
-            
-                self.original_token_list = [token]
-                index = random.randrange(0, len(token.form)-1)
-                self.error_token_list = [token.form[:index] + token.form[index + 1:]]
-
-                self.error_type = "|||R:SPELL|||"
-                self.related_token_id = [token.id]
-        
-            elif apakah_akan_dilakukan == 1 and rand == 2: ## Add one char
-                
-                self.original_token_list = [token]
+            operations = cls.spelling_operations[:3]
+            if len(list(filter(lambda x: x in cls.huruf_hidup, token.lemma))) > 0 and len(token.form) < 7:
+                operations = cls.spelling_operations
+
+            # Error is made in 1 of 39 tokens, with one of the 4 operations chosen (if it can be done)
+            return cls.create_candidate(
+                original_token_list=[token],
+                alternatives=operations,
+                error_type="|||R:SPELL|||",
+                related_token_id=[token.id],
+                probability=1 / 39 * len(operations) / len(cls.spelling_operations),
+            )
 
-                # Get random noise character which is not the same as the original char
-                index = random.randrange(0, len(token.form)-1)
-                char_chosen = token.form[index]
-                noise_char = char_chosen   # Initially noise char == char chosen
-                while noise_char == char_chosen:
-                    noise_char = random.choice(string.ascii_lowercase)
+    @classmethod
+    def sample_alternative(cls, candidate, sentence):
+        token = sentence.get_token_by_id(candidate.original_token_id[0])
+        operation = random.choice(candidate.alternatives)
 
-                self.error_token_list = [token.form[:index] + noise_char + token.form[index + 1: ]]
+        if operation == "erase": ## Erase one char
+            index = random.randrange(0, len(token.form)-1)
+            return [token.form[:index] + token.form[index + 1:]]
 
-                self.error_type = "|||R:SPELL|||"
-                self.related_token_id = [token.id]
+        elif operation == "add": ## Add one char
+            # Get random noise character which is not the same as the original char
+            index = random.randrange(0, len(token.form)-1)
+            char_chosen = token.form[index]
+            noise_char = char_chosen   # Initially noise char == char chosen
+            while noise_char == char_chosen:
+                noise_char = random.choice(string.ascii_lowercase)
 
-            elif apakah_akan_dilakukan == 1 and rand == 3: ## Tukar char sebelahnya
-                
-                self.original_token_list = [token]
-                index = random.randrange(1, len(token.form)-2)
-                self.error_token_list  = [token.form[:index] + token.form[index+1] + token.form[index]  + token.form[index + 2: ]]
-                
-                self.error_type = "|||R:SPELL|||"
-                self.related_token_id = [token.id]
+            return [token.form[:index] + noise_char + token.form[index + 1: ]]
 
-            elif apakah_akan_dilakukan == 1 and rand == 4 and len(list(filter(lambda x: x in self.huruf_hidup, token.lemma))) > 0 and len(token.form) < 7:
-                
-                self.original_token_list = [token]
-                self.error_token_list = [(token.form[0] + re.sub("[aeiou]", "", token.form[1:])).replace("ng", "g")]
+        elif operation == "swap": ## Tukar char sebelahnya
+            index = random.randrange(1, len(token.form)-2)
+            return [token.form[:index] + token.form[index+1] + token.form[index]  + token.form[index + 2: ]]
 
-                self.error_type = "|||R:SPELL|||"
-                self.related_token_id = [token.id]
+        else:
+            return [(token.form[0] + re.sub("[aeiou]", "", token.form[1:])).replace("ng", "g")]
 
 
 class VerbError(Error):
@@ -802,25 +857,21 @@ class VerbError(Error):
     error_type_id = "VERB"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         if token.upos == 'VERB':
 
-            # Get synonym of token form
-            sinonims = sentence.dataset.get_sinonim(token.form)
+            # Get synonym of token form, already split into tokens
+            sinonims = sentence.dataset.get_sinonim_tokens(token.form, 'VERB')
 
             # Only add error if there is sinonims
             if len(sinonims) > 0:
-                self.original_token_list = [token]
-                self.error_token_list = random.choice(sinonims).split(" ")
-                
-                self.error_type = "|||R:VERB|||"
-                self.related_token_id = [token.id]
+                return cls.create_candidate(
+                    original_token_list=[token],
+                    alternatives=sinonims,
+                    error_type="|||R:VERB|||",
+                    related_token_id=[token.id],
+                )
 
 
 class VerbInflectionError(Error):
@@ -831,63 +882,73 @@ class VerbInflectionError(Error):
     error_type_id = "VERB:INFL"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
+    @classmethod
+    def get_candidate(cls, token, sentence):
+        if token.upos == 'VERB' and token.morf[0] != token.lemma:
+            error_forms = cls.get_error_forms(token.form.lower(), token.lemma, token.morf)
 
-    def generate_error(self):
-        token = self.token
+            if error_forms:
+                return cls.create_candidate(
+                    original_token_list=[token],
+                    alternatives=[list(error_form) for error_form in error_forms],
+                    error_type="|||R:VERB:INFL|||",
+                    related_token_id=[token.id],
+                )
 
-        token_form_lower = token.form.lower()
-        token_lemma = token.lemma
+    @classmethod
+    @lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+    def get_error_forms(cls, token_form_lower, token_lemma, morf):
+        # Error forms (as tuples of tokens) of prefixed verb
 
         # init var
-        prefix = ""
+        prefix_choices = []
 
-        if token.upos == 'VERB' and token.morf[0] != token_lemma:
-            if (
-                (token_form_lower[:2] == "me" and token_lemma[0] in self.konsonan_luluh and token_lemma[1] in self.huruf_hidup and token_form_lower not in self.luluh_exception) 
-                or (token_form_lower[:2] == "me" and len(list(filter(lambda x: x in self.huruf_hidup, token_lemma))) == 1)
-            ):
-                # If prefix has substring "me", and the above if conditions apply,
-                # then error can be generated by replacing prefix with "men"
-                prefix = "men"
+        if (
+            (token_form_lower[:2] == "me" and token_lemma[0] in cls.konsonan_luluh and token_lemma[1] in cls.huruf_hidup and token_form_lower not in cls.luluh_exception) 
+            or (token_form_lower[:2] == "me" and len(list(filter(lambda x: x in cls.huruf_hidup, token_lemma))) == 1)
+        ):
+            # If prefix has substring "me", and the above if conditions apply,
+            # then error can be generated by replacing prefix with "men"
+            prefix_choices = ["men"]
+        
+        elif ( token_form_lower[:2] == "me" and token_form_lower not in cls.bahasa_asing):
+            if token_form_lower[:4] == "meng":
+                prefix_choices = ["men","menge","meny","me","mem"]
+            elif token_form_lower[:3] == "men":
+                prefix_choices = ["meng","menge","meny","me","mem"]
+            elif token_form_lower[:3] == "meny":
+                prefix_choices = ["meng","men","menge","me","mem"]
+            elif token_form_lower[:3] == "mem":
+                prefix_choices = ["meng","men","menye","menge","me"]
+            elif token_form_lower[:2] == "me":
+                prefix_choices = ["meng","men","menye","menge","mem"]
             
-            elif ( token_form_lower[:2] == "me" and token_form_lower not in self.bahasa_asing):
-                if token_form_lower[:4] == "meng":
-                    prefix = random.choice(["men","menge","meny","me","mem"])
-                elif token_form_lower[:3] == "men":
-                    prefix = random.choice(["meng","menge","meny","me","mem"])
-                elif token_form_lower[:3] == "meny":
-                    prefix = random.choice(["meng","men","menge","me","mem"])
-                elif token_form_lower[:3] == "mem":
-                    prefix = random.choice(["meng","men","menye","menge","me"])
-                elif token_form_lower[:2] == "me":
-                    prefix = random.choice(["meng","men","menye","menge","mem"])
-                
-
-            elif token.morf[0] == "ber":
-                if token_form_lower[:3] == "ber":
-                    prefix = "be"
-                else:
-                    prefix = "ber"
 
-            elif token.morf[0] == "ter":
-                if token_form_lower[:3] == "ter":
-                    prefix = "te"
-                else:
-                    prefix = "ter"
+        elif morf[0] == "ber":
+            if token_form_lower[:3] == "ber":
+                prefix_choices = ["be"]
+            else:
+                prefix_choices = ["ber"]
 
-            if prefix:
-                try:
-                    lemma_and_suffix = "".join(token.morf[token.morf.find(token_lemma):])
-                except:
-                    lemma_and_suffix = "".join(token.morf[1:])
+        elif morf[0] == "ter":
+            if token_form_lower[:3] == "ter":
+                prefix_choices = ["te"]
+            else:
+                prefix_choices = ["ter"]
+
+        if not prefix_choices:
+            return ()
+
+        try:
+            lemma_and_suffix = "".join(morf[morf.find(token_lemma):])
+        except:
+            lemma_and_suffix = "".join(morf[1:])
 
-                self.original_token_list = [token]
-                self.error_token_list = (prefix + lemma_and_suffix).split(" ")
+        return tuple(tuple((prefix + lemma_and_suffix).split(" ")) for prefix in prefix_choices)
 
-                self.error_type = "|||R:VERB:INFL|||"
-                self.related_token_id = [token.id]
+    @classmethod
+    def get_transform_cache_info(cls):
+        return cls.get_error_forms.cache_info()
 
 
 class VerbTenseError(Error):
@@ -907,28 +968,9 @@ class VerbTenseError(Error):
     error_type_id = "VERB:TENSE"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
-        token_lemma = token.lemma
-        
-        # init var
-        error_words = ""
-        
-        if token.upos == 'VERB' and token.feats and "Voice" in token.feats and token.form.lower() not in self.no_passive_state:
-
-            # Get Form without Prefix (if theres any)
-            try:
-                lemma_and_suffix_list = token.morf[token.morf.find(token_lemma):]
-            except:
-                if token.morf[0] != token_lemma:
-                    lemma_and_suffix_list = token.morf[1:]
-                else:
-                    lemma_and_suffix_list = token.morf
+    @classmethod
+    def get_candidate(cls, token, sentence):
+        if token.upos == 'VERB' and token.feats and "Voice" in token.feats and token.form.lower() not in cls.no_passive_state:
 
             # Get next two tokens
             token_id_after = token.id + 1
@@ -945,53 +987,83 @@ class VerbTenseError(Error):
             # If only next_token is a nominal OR next_two_token is a nominal and next_token supports next_two_token
             if (
                 token.feats["Voice"] == "Act" 
-                and (
+                and not (
                         (
                             token_after is not None 
-                            and token_after.deprel in self.deprel_nominals
+                            and token_after.deprel in cls.deprel_nominals
                         ) 
                     or  (
                             token_after is not None 
                             and token_two_after is not None 
-                            and token_two_after.deprel in self.deprel_nominals 
+                            and token_two_after.deprel in cls.deprel_nominals 
                             and token_after.head == token_two_after.id
                         )
                     )
             ):
-                error_words = "di" + "".join(lemma_and_suffix_list)
-            
-            # Pass -> Act
-            elif token.feats["Voice"] == "Pass":
-
-                lemma_and_suffix = "".join(lemma_and_suffix_list)
-                if token_lemma[0] in self.konsonan_luluh and token_lemma[1] in self.huruf_hidup:
-                    if lemma_and_suffix_list[0] != token.lemma and lemma_and_suffix_list[0][0] in self.konsonan_luluh:
-                        # If Consonant starts second lemma.
-                        token_lemma = lemma_and_suffix
-                    else:
-                        # If not, leburkan konsonan
-                        lemma_and_suffix = "".join(lemma_and_suffix_list)[1:]
-
-                if token_lemma[0] in self.me_group:
-                    error_words = "me" + lemma_and_suffix
-                elif token_lemma[0] in self.mem_group:
-                    error_words = "mem" + lemma_and_suffix
-                elif token_lemma[0] in self.meng_group:
-                    error_words = "meng" + lemma_and_suffix
-                elif token_lemma[0] in self.meny_group:
-                    error_words = "meny" + lemma_and_suffix
-                elif len(list(filter(lambda x: x in self.huruf_hidup, token.lemma))) == 1:
-                    error_words = "menge" + lemma_and_suffix
-                else:
-                    error_words = "men" + lemma_and_suffix
+                return None
+
+            error_words = cls.get_voice_form(token.feats["Voice"], token.lemma, token.morf)
 
             if error_words:
-                self.original_token_list = [token]
-                self.error_token_list = error_words.split(" ")
+                return cls.create_candidate(
+                    original_token_list=[token],
+                    alternatives=[error_words.split(" ")],
+                    error_type="|||R:VERB:TENSE|||",
+                    related_token_id=[token.id],
+                )
+
+    @classmethod
+    @lru_cache(maxsize=TRANSFORM_CACHE_SIZE)
+    def get_voice_form(cls, voice, token_lemma, morf):
+        # Verb form in the other voice (Act -> Pass, Pass -> Act), empty string if there is none
+        lemma = token_lemma
+
+        # init var
+        error_words = ""
+
+        # Get Form without Prefix (if theres any)
+        try:
+            lemma_and_suffix_list = morf[morf.find(token_lemma):]
+        except:
+            if morf[0] != token_lemma:
+                lemma_and_suffix_list = morf[1:]
+            else:
+                lemma_and_suffix_list = morf
+
+        # Act -> Pass
+        if voice == "Act":
+            error_words = "di" + "".join(lemma_and_suffix_list)
+        
+        # Pass -> Act
+        elif voice == "Pass":
+
+            lemma_and_suffix = "".join(lemma_and_suffix_list)
+            if token_lemma[0] in cls.konsonan_luluh and token_lemma[1] in cls.huruf_hidup:
+                if lemma_and_suffix_list[0] != lemma and lemma_and_suffix_list[0][0] in cls.konsonan_luluh:
+                    # If Consonant starts second lemma.
+                    token_lemma = lemma_and_suffix
+                else:
+                    # If not, leburkan konsonan
+                    lemma_and_suffix = "".join(lemma_and_suffix_list)[1:]
+
+            if token_lemma[0] in cls.me_group:
+                error_words = "me" + lemma_and_suffix
+            elif token_lemma[0] in cls.mem_group:
+                error_words = "mem" + lemma_and_suffix
+            elif token_lemma[0] in cls.meng_group:
+                error_words = "meng" + lemma_and_suffix
+            elif token_lemma[0] in cls.meny_group:
+                error_words = "meny" + lemma_and_suffix
+            elif len(list(filter(lambda x: x in cls.huruf_hidup, lemma))) == 1:
+                error_words = "menge" + lemma_and_suffix
+            else:
+                error_words = "men" + lemma_and_suffix
 
-                self.error_type = "|||R:VERB:TENSE|||"
-                self.related_token_id = [token.id]
+        return error_words
 
+    @classmethod
+    def get_transform_cache_info(cls):
+        return cls.get_voice_form.cache_info()
 
 
 class WordOrderError(Error):
@@ -999,31 +1071,28 @@ class WordOrderError(Error):
     error_type_id = "WO"
     max_ratio = 0.075
 
-    def __init__(self, token, sentence):
-        super().__init__(token, sentence)
-
-    def generate_error(self):
-        token = self.token
-        sentence = self.sentence
-
+    @classmethod
+    def get_candidate(cls, token, sentence):
         token_id_after = token.id + 1
         token_after = None
         if sentence.does_token_id_exists(token_id_after):
             token_after = sentence.get_token_by_id(token_id_after)
 
         if token_after and ((token.upos == 'NOUN' and token_after.upos in ['PRON', 'ADJ']) or (token.upos == 'ADV' and token_after.upos in ['VERB', 'ADJ']) or (token.upos == ['VERB', 'ADJ'] and token_after.upos in 'ADV')):
-            self.original_token_list = [token, token_after]
-
             if token.id == 0: # If token is first in sentence
                 if token_after.form == token_after.form.upper():
                     # if token_after is all capitalized
-                    self.error_token_list = [token_after.form[0].upper() + token_after.form[1:], token.form]
+                    error_token_list = [token_after.form[0].upper() + token_after.form[1:], token.form]
                 else:
                     # if token_after is not all capitalized
-                    self.error_token_list = [token_after.form[0].upper() + token_after.form[1:], token.form[0].lower() + token.form[1:]]
+                    error_token_list = [token_after.form[0].upper() + token_after.form[1:], token.form[0].lower() + token.form[1:]]
 
             else:
-                self.error_token_list = [token_after.form, token.form]
-
-            self.error_type = "|||R:WO|||"
-            self.related_token_id = [token.id, token_after.id]
\ No newline at end of file
+                error_token_list = [token_after.form, token.form]
+
+            return cls.create_candidate(
+                original_token_list=[token, token_after],
+                alternatives=[error_token_list],
+                error_type="|||R:WO|||",
+                related_token_id=[token.id, token_after.id],
+            )
\ No newline at end of file
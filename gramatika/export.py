@@ -0,0 +1,148 @@
+import mmap
+import struct
+
+
+# Binary record file layout (all integers little endian):
+#
+#   record*  : u32 record size (bytes after this field), u16 number of source tokens,
+#              u16 number of target tokens, u16 number of edits,
+#              u16 length of every source token, u16 length of every target token,
+#              5 x u16 for every edit (source_start, source_end, target_start, target_end, error_type_id),
+#              source token bytes, target token bytes
+#   table    : u16 number of error types, then u16 length + ascii bytes of every error type
+#   trailer  : u64 table offset, u32 number of records, 4 bytes magic
+#
+# Source is the sentence with error (the "S" line of M2 output), target is the original sentence.
+# Edit spans are token positions, error_type_id is the index of the error type (ex. "R:ADJ") in the table.
+
+MAGIC = b"GRMK"
+
+RECORD_HEADER = struct.Struct("<IHHH")
+EDIT = struct.Struct("<HHHHH")
+TABLE_HEADER = struct.Struct("<H")
+TRAILER = struct.Struct("<QI4s")
+
+
+class RecordWriter():
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file_output = open(filename, "wb")
+
+        self.error_type_dict = {}
+        self.total_record = 0
+
+    def get_error_type_id(self, error_type):
+        # error_type is in M2 form "|||R:ADJ|||", only "R:ADJ" is saved in table
+        error_type = error_type.strip("|")
+
+        if error_type not in self.error_type_dict:
+            self.error_type_dict[error_type] = len(self.error_type_dict)
+
+        return self.error_type_dict[error_type]
+
+    def write(self, original_sentence, error_sentence, edit_list):
+        source_tokens = [token.encode("ascii") for token in error_sentence.split(" ")] if error_sentence else []
+        target_tokens = [token.encode("ascii") for token in original_sentence.split(" ")] if original_sentence else []
+
+        data = bytearray()
+        data += struct.pack(f"<{len(source_tokens)}H", *[len(token) for token in source_tokens])
+        data += struct.pack(f"<{len(target_tokens)}H", *[len(token) for token in target_tokens])
+
+        for source_start, source_end, target_start, target_end, error_type, _ in edit_list:
+            data += EDIT.pack(source_start, source_end, target_start, target_end, self.get_error_type_id(error_type))
+
+        data += b"".join(source_tokens)
+        data += b"".join(target_tokens)
+
+        self.file_output.write(RECORD_HEADER.pack(len(data) + RECORD_HEADER.size - 4, len(source_tokens), len(target_tokens), len(edit_list)))
+        self.file_output.write(data)
+
+        self.total_record += 1
+
+    def close(self):
+        table_offset = self.file_output.tell()
+
+        self.file_output.write(TABLE_HEADER.pack(len(self.error_type_dict)))
+        for error_type in self.error_type_dict.keys():
+            error_type_bytes = error_type.encode("ascii")
+            self.file_output.write(TABLE_HEADER.pack(len(error_type_bytes)))
+            self.file_output.write(error_type_bytes)
+
+        self.file_output.write(TRAILER.pack(table_offset, self.total_record, MAGIC))
+        self.file_output.close()
+
+
+class RecordReader():
+
+    def __init__(self, filename):
+        self.filename = filename
+
+        with open(filename, "rb") as file_input:
+            self.__mmap = mmap.mmap(file_input.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__data = memoryview(self.__mmap)
+
+        table_offset, self.total_record, magic = TRAILER.unpack_from(self.__data, len(self.__data) - TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a gramatika record file")
+
+        # Table of error types
+        self.error_type_list = []
+        position = table_offset
+        total_error_type, = TABLE_HEADER.unpack_from(self.__data, position)
+        position += TABLE_HEADER.size
+        for _ in range(total_error_type):
+            length, = TABLE_HEADER.unpack_from(self.__data, position)
+            position += TABLE_HEADER.size
+            self.error_type_list.append(bytes(self.__data[position:position + length]).decode("ascii"))
+            position += length
+
+        # Offset of every record, so records can be accessed randomly
+        self.__record_offsets = []
+        position = 0
+        while position < table_offset:
+            self.__record_offsets.append(position)
+            record_size, = struct.unpack_from("<I", self.__data, position)
+            position += 4 + record_size
+
+    def __len__(self):
+        return self.total_record
+
+    def __getitem__(self, index):
+        # Get (source_tokens, target_tokens, edit_list) of a record.
+        # Tokens are memoryview slices of the mapped file, no data is copied
+        data = self.__data
+        position = self.__record_offsets[index]
+
+        _, total_source, total_target, total_edit = RECORD_HEADER.unpack_from(data, position)
+        position += RECORD_HEADER.size
+
+        source_lengths = struct.unpack_from(f"<{total_source}H", data, position)
+        position += 2 * total_source
+        target_lengths = struct.unpack_from(f"<{total_target}H", data, position)
+        position += 2 * total_target
+
+        edit_list = []
+        for _ in range(total_edit):
+            edit_list.append(EDIT.unpack_from(data, position))
+            position += EDIT.size
+
+        source_tokens = []
+        for length in source_lengths:
+            source_tokens.append(data[position:position + length])
+            position += length
+
+        target_tokens = []
+        for length in target_lengths:
+            target_tokens.append(data[position:position + length])
+            position += length
+
+        return source_tokens, target_tokens, edit_list
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self):
+        self.__data.release()
+        self.__mmap.close()
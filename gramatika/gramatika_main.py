@@ -1,29 +1,20 @@
 from .tesaurus import Tesaurus
 from .sentence import Sentence
-from .error import (
-    AdjectiveError,
-    AdverbError,
-    ConjunctionError,
-    DeterminerError,
-    MorphologyError,
-    NounError,
-    NounInflectionError,
-    OrthographyError,
-    ParticleError,
-    PrepositionError,
-    PronounError,
-    PunctuationError,
-    SpellingError,
-    VerbError,
-    VerbInflectionError,
-    VerbTenseError,
-    WordOrderError,
-)
-
-from conllu import parse
+from .corpus import CorpusReader
+from .cache import SentenceCache
+from .writer import DatasetWriter
+from .pipeline import GramatikaPipeline
+from .registry import ErrorRegistry
+from .scheduler import QuotaScheduler
+from .index import CandidateIndex
+from .conllu_reader import parse_conllu
+from .prefilter import SentencePrefilter
+from concurrent.futures import ProcessPoolExecutor
+
+import collections
 import copy
-
-from tqdm import tqdm
+import itertools
+import os
 import random
 
 
@@ -35,45 +26,85 @@ class GramatikaDataset():
 
         self.__sinonim_dict = Tesaurus(args.sinonim_file)
 
+        self.corpus_reader = CorpusReader(
+            input_filename=args.input_filename,
+            shard_index=args.shard_index,
+            shard_count=args.shard_count,
+            offset_index_file=args.offset_index_file,
+        )
+
         self.max_error_in_sentence = args.max_error_in_sentence
         self.max_same_error_in_sentence = args.max_same_error_in_sentence
         self.no_error_sentence_ratio = args.no_error_sentence_ratio
-        self.total_sentence = args.total_sentence
+        # Each shard only produces its own part of total_sentence
+        self.total_sentence = self.corpus_reader.get_shard_total_sentence(args.total_sentence)
         self.total_sentence_real = 0
 
+        self.binary_output = args.binary_output
+
+        # Parse input with the minimal reader in conllu_reader instead of conllu package
+        self.fast_reader = args.fast_reader
+
+        # Sentences which can not be saved are dropped from raw input before parsing
+        self.prefilter = None
+        if args.prefilter or args.min_sentence_length is not None or args.max_sentence_length is not None:
+            self.prefilter = SentencePrefilter(
+                min_length=args.min_sentence_length,
+                max_length=args.max_sentence_length,
+            )
+
+        self.pipeline = args.pipeline
+        self.chunk_size = args.chunk_size
+        self.num_workers = args.num_workers
+
         self.total_sentence_with_error = 0
         self.total_sentence_without_error = 0
 
-        # Initiate all error types
-        list_of_all_error_classes = [
-            AdjectiveError,
-            AdverbError,
-            ConjunctionError,
-            DeterminerError,
-            MorphologyError,
-            NounError,
-            NounInflectionError,
-            OrthographyError,
-            ParticleError,
-            PrepositionError,
-            PronounError,
-            PunctuationError,
-            SpellingError,
-            VerbError,
-            VerbInflectionError,
-            VerbTenseError,
-            WordOrderError,
-        ]
+        # Initiate error types enabled for this run,
+        # classes of disabled error types are never loaded
+        registry = ErrorRegistry()
+
+        error_type_ids = registry.select_error_type_ids(args.error_types, args.exclude_error_types, args.error_type_weights)
+        error_type_weights = args.error_type_weights if args.error_type_weights else {}
+
+        # Weight is normalized so that with all error types enabled and no custom weights every weight is 1,
+        # and error type ratios (and max_ratio) are relative to the share each error type should get
+        total_weight = sum([error_type_weights.get(error_type_id, 1) for error_type_id in error_type_ids])
+        total_registered = len(registry.get_error_type_ids())
 
         self.error_dict = {}
 
-        for error_class in list_of_all_error_classes:
-            self.error_dict[error_class.error_type_id] = {
-                "class" : error_class,
+        for error_type_id in error_type_ids:
+            self.error_dict[error_type_id] = {
+                "class" : registry.load(error_type_id),
                 "count" : 0,
+                "weight" : error_type_weights.get(error_type_id, 1) * total_registered / total_weight,
+                "skip_count" : 0,
             }
 
-        # List of Senteces
+        # Cache of repeated sentences. Saved cache is only used with the same thesaurus and error types
+        self.sentence_cache = None
+        if args.sentence_cache_size > 0:
+            self.sentence_cache = SentenceCache(
+                max_size=args.sentence_cache_size,
+                cache_file=args.sentence_cache_file,
+                tesaurus=self.__sinonim_dict,
+                error_type_ids=list(self.error_dict.keys()),
+            )
+            self.sentence_cache.load()
+
+        # Quotas of error types are planned from candidates of the whole input
+        self.scheduler = None
+        if args.quota_scheduler:
+            self.scheduler = QuotaScheduler(self)
+
+        # Sentences are drawn from index of error candidates, see generate_targeted
+        self.targeted = args.targeted
+
+        # Number of error sets sampled from each sentence, see count_variants
+        self.variants = args.variants
+
+        # Records (see SentenceRecord) of accepted sentences, in output order
         self.sentence_list = []
 
     def get_total_error(self):
@@ -82,152 +113,354 @@ class GramatikaDataset():
             total += self.error_dict[error_type_id]["count"]
         return total
 
+    def get_error_type_ratio(self, error_type_id):
+        # With quota scheduler, ratio is how much of its quota has been filled
+        if self.scheduler is not None:
+            return self.scheduler.get_fill_ratio(error_type_id)
+
+        total_error_on_dataset = self.get_total_error()
+
+        if total_error_on_dataset > 0:
+            error_type = self.error_dict[error_type_id]
+            return error_type["count"] / total_error_on_dataset / error_type["weight"]
+        else:
+            return 0
+
+    def get_saturated_error_type_ids(self):
+        # Error types which already reached their max_ratio. Their errors would be thrown away
+        # by filter_by_max_ratio anyway, so their candidates are neither made nor sampled.
+        # Quotas of scheduler are soft (see filter_by_quota), so nothing is skipped with it
+        if self.scheduler is not None:
+            return set()
+
+        return {
+            error_type_id for error_type_id, error_type in self.error_dict.items()
+            if self.get_error_type_ratio(error_type_id) >= error_type["class"].max_ratio
+        }
+
+    def is_sentence_without_error_needed(self):
+        # Will the next sentence have no errors, based on args.no_error_sentence_ratio
+        return self.total_sentence_real > 25 and self.total_sentence_without_error / self.total_sentence_real < self.no_error_sentence_ratio
+
     def get_sinonim_dict(self):
         return self.__sinonim_dict
     
     def get_sinonim(self, word):
         return self.get_sinonim_dict().get_sinonim(word.lower())
     
+    def get_sinonim_tokens(self, word, upos):
+        return self.get_sinonim_dict().get_sinonim_tokens(word.lower(), upos)
+
     def get_most_similar(self, word):
         return self.get_sinonim_dict().get_most_similar(word.lower())
 
+    def get_morphology_target(self, lemma):
+        return self.get_sinonim_dict().get_morphology_target(lemma)
+
+    def collect_vocabulary(self):
+        # Get lowercased forms of all tokens in input treebank (the words get_sinonim is called with)
+        # and lemmas of meN- verbs (whose nominalization targets are looked up), in one pass
+        from tqdm import tqdm
+
+        from .error import MorphologyError
+
+        words = set()
+        lemmas = set()
+        for text in tqdm(CorpusReader(self.input_filename).iter_chunks(self.chunk_size)):
+            for sentence_conll in parse_conllu(text, self.fast_reader):
+                sentence = Sentence(
+                    sentence_conll=sentence_conll,
+                    dataset=self,
+                    with_error=False,
+                )
+
+                for token in sentence.token_list:
+                    words.add(token.form.lower())
+                    if MorphologyError.is_meN_verb(token):
+                        lemmas.add(token.lemma)
+
+        return words, sorted(lemmas)
+
+    def precompute_morphology_table(self):
+        # Resolve nominalization target of every meN- verb lemma in input treebank
+        # and save them alongside the thesaurus, unless the saved table is up to date
+        tesaurus = self.get_sinonim_dict()
+        if tesaurus.is_morphology_table_up_to_date(self.input_filename):
+            print(f"{tesaurus.get_morphology_table_filename()} is up to date")
+            return
+
+        _, lemmas = self.collect_vocabulary()
+
+        tesaurus.save_morphology_table(lemmas, self.input_filename)
+        print(f"{len(lemmas)} lemmas saved to {tesaurus.get_morphology_table_filename()}")
+
+    def prune_tesaurus(self):
+        # Save a thesaurus with only the entries input treebank can query, and the nominalization targets
+        # of its meN- verbs as morphology table of it. Generating from the same treebank with the pruned
+        # thesaurus as sinonim_file gives the same dataset, with less to load and search
+        tesaurus = self.get_sinonim_dict()
+        words, lemmas = self.collect_vocabulary()
+
+        pruned_tesaurus = tesaurus.save_pruned(words, lemmas, self.input_filename)
+        print(f"{len(pruned_tesaurus.get_sinonim_dict())} of {len(tesaurus.get_sinonim_dict())} entries saved to {pruned_tesaurus.get_filename()}")
+        print(f"{len(lemmas)} lemmas saved to {pruned_tesaurus.get_morphology_table_filename()}")
+
     def generate_dataset(self):
-        with open(self.input_filename, "r", encoding="ascii", errors='ignore') as file_input:
-            output_conll = parse(file_input.read())
+        if self.pipeline:
+            # Read, generate and write stages run concurrently
+            GramatikaPipeline(
+                dataset=self,
+                chunk_size=self.chunk_size,
+                num_workers=self.num_workers,
+            ).run()
+        else:
+            self.generate_dataset_sequential()
+
+        if self.sentence_cache is not None:
+            self.sentence_cache.save()
+
+    def generate_dataset_sequential(self):
+
+        # Imported here so that startup (ex. --help) does not pay for it
+        from tqdm import tqdm
+
+        # Only the slice of input file belonging to this shard is read and parsed
+        output_conll = self.parse_input()
 
         # Shuffle parsed output_conll randomly every time code runs
         # so the resulting dataset will also be randomized
         random.shuffle(output_conll)
 
+        if self.targeted:
+            self.generate_targeted(output_conll)
+            return
+
+        if self.scheduler is not None:
+            self.generate_scheduled(output_conll)
+            return
+
         # Create Sentence objects
         for sentence_conll in tqdm(output_conll):
             if self.total_sentence_real == self.total_sentence:
                 continue
 
+            for sentence in self.process_sentence_variants(sentence_conll):
+                self.sentence_list.append(sentence.get_record())
+
+        self.output_dataset()
+
+    def iter_input_chunks(self):
+        # Text chunks of input (only the slice of this shard), without sentences dropped by prefilter
+        for text in self.corpus_reader.iter_chunks(self.chunk_size):
+            if self.prefilter is not None:
+                text = self.prefilter.filter_text(text)
+            yield text
+
+    def parse_input(self):
+        # Input is split into chunks of chunk_size sentences (at blank lines), which are parsed
+        # in num_workers processes. Parsed chunks are joined in input order, so the shuffle after
+        # gives the same order for the same seed whatever the number of workers
+        num_workers = self.num_workers if self.num_workers else os.cpu_count()
+        text_chunks = self.iter_input_chunks()
+
+        output_conll = []
+
+        # Input of one chunk is parsed in the main process, there is nothing to run in parallel
+        if num_workers > 1:
+            first_chunks = list(itertools.islice(text_chunks, 2))
+            text_chunks = itertools.chain(first_chunks, text_chunks)
+
+        if num_workers <= 1 or len(first_chunks) <= 1:
+            for text in text_chunks:
+                output_conll.extend(parse_conllu(text, self.fast_reader))
+            return output_conll
+
+        # Executor.map would read every chunk before the first one is parsed, so only a few chunks
+        # per worker are read ahead, and raw text of the whole input is never held with parsed sentences
+        with ProcessPoolExecutor(num_workers) as executor:
+            future_queue = collections.deque()
+            for text in text_chunks:
+                future_queue.append(executor.submit(parse_conllu, text, self.fast_reader))
+                if len(future_queue) >= 2 * num_workers:
+                    output_conll.extend(future_queue.popleft().result())
+
+            while future_queue:
+                output_conll.extend(future_queue.popleft().result())
+
+        return output_conll
+
+    def prepare_sentences(self, output_conll):
+        from tqdm import tqdm
+
+        # Tokens and error candidates of all sentences, errors are not sampled yet
+        prepared_sentence_list = []
+        for sentence_conll in tqdm(output_conll, desc="Enumerating candidates"):
             sentence = Sentence(
                 sentence_conll=sentence_conll,
-                dataset=self
+                dataset=self,
+                with_error=False,
             )
+            sentence.init_candidates()
+            prepared_sentence_list.append(sentence)
 
-            if sentence.is_valid():
-                # Only save sentence object if it is valid to be saved
-                self.sentence_list.append(sentence)
-                
-                for error in sentence.error_list:
-                    self.error_dict[error.error_type_id]["count"] += 1
+        return prepared_sentence_list
 
-                self.total_sentence_real += 1
+    def generate_prepared_sentence(self, sentence):
+        # Returns True if at least one variant of sentence is valid to be saved
+        sentence.generate_error()
+        variant_list = self.count_variants(sentence)
 
-                if sentence.will_have_error:
-                    self.total_sentence_with_error += 1
-                else:
-                    self.total_sentence_without_error += 1
+        for variant in variant_list:
+            self.sentence_list.append(variant.get_record())
+
+        return len(variant_list) > 0
+
+    def generate_scheduled(self, output_conll):
+        from tqdm import tqdm
+
+        # Candidates of all sentences are enumerated first to plan quotas
+        prepared_sentence_list = self.prepare_sentences(output_conll)
+        prepared_sentence_list = self.scheduler.schedule(prepared_sentence_list, self.total_sentence)
+
+        for sentence in tqdm(prepared_sentence_list, desc="Generating errors"):
+            if self.total_sentence_real == self.total_sentence:
+                break
+
+            self.generate_prepared_sentence(sentence)
 
         self.output_dataset()
 
+    def get_error_type_need(self, error_type_id):
+        # The lower, the more error type is needed
+        if self.scheduler is not None:
+            return self.scheduler.get_fill_ratio(error_type_id)
+        else:
+            return self.error_dict[error_type_id]["count"] / self.error_dict[error_type_id]["weight"]
+
+    def generate_targeted(self, output_conll):
+        from tqdm import tqdm
+
+        # Instead of walking the (shuffled) input, every next sentence is drawn
+        # from the sentences which can produce the error type needed the most,
+        # so rare error types do not wait for their sentences to come by
+        prepared_sentence_list = self.prepare_sentences(output_conll)
+        if self.scheduler is not None:
+            prepared_sentence_list = self.scheduler.schedule(prepared_sentence_list, self.total_sentence)
+
+        candidate_index = CandidateIndex(self.error_dict.keys())
+        for sentence_index, sentence in enumerate(prepared_sentence_list):
+            candidate_index.add_sentence(sentence_index, sentence)
+
+        sentence_indexes = {}
+        for error_type_id in candidate_index.get_error_type_ids():
+            if candidate_index.get_total_sentence(error_type_id) > 0:
+                sentence_indexes[error_type_id] = iter(candidate_index.get_sentence_indexes(error_type_id))
+
+        drawn_sentence_indexes = set()
+        saved_sentence_indexes = set()
+        progress = tqdm(total=self.total_sentence, desc="Generating errors")
+
+        while self.total_sentence_real < self.total_sentence and sentence_indexes:
+            error_type_id = min(sentence_indexes.keys(), key=self.get_error_type_need)
+
+            # Next sentence of error type which has not been drawn by other error types
+            sentence_index = next(sentence_indexes[error_type_id], None)
+            while sentence_index in drawn_sentence_indexes:
+                sentence_index = next(sentence_indexes[error_type_id], None)
+
+            if sentence_index is None:
+                del sentence_indexes[error_type_id]
+                continue
+
+            drawn_sentence_indexes.add(sentence_index)
+
+            total_sentence_before = self.total_sentence_real
+            if self.generate_prepared_sentence(prepared_sentence_list[sentence_index]):
+                saved_sentence_indexes.add(sentence_index)
+                progress.update(self.total_sentence_real - total_sentence_before)
+
+        # Indexed sentences ran out. The rest of sentences (ex. with errors only made by chance),
+        # and drawn sentences which were not valid at that time, are walked in order
+        for sentence_index, sentence in enumerate(prepared_sentence_list):
+            if self.total_sentence_real == self.total_sentence:
+                break
+
+            if sentence_index in saved_sentence_indexes:
+                continue
+
+            total_sentence_before = self.total_sentence_real
+            self.generate_prepared_sentence(sentence)
+            progress.update(self.total_sentence_real - total_sentence_before)
+
+        progress.close()
+        self.output_dataset()
+
+    def process_sentence(self, sentence_conll):
+        # Generate errors for one parsed sentence.
+        # Returns the Sentence object if it is valid to be saved (and counts it), otherwise None
+        sentence = Sentence(
+            sentence_conll=sentence_conll,
+            dataset=self
+        )
+
+        return self.count_sentence(sentence)
+
+    def process_sentence_variants(self, sentence_conll):
+        # Same as process_sentence, but returns the list of valid variants of sentence
+        sentence = Sentence(
+            sentence_conll=sentence_conll,
+            dataset=self
+        )
+
+        return self.count_variants(sentence)
+
+    def count_variants(self, sentence):
+        # Sentence already has its first error set sampled. The other variants share its tokens
+        # and error candidates (generate_error only replaces error_list), only errors are sampled again.
+        # Every valid variant is counted as one sentence of total_sentence
+        variant_list = []
+        for variant_index in range(self.variants):
+            if self.total_sentence_real == self.total_sentence:
+                break
+
+            if variant_index > 0:
+                sentence = copy.copy(sentence)
+                sentence.generate_error()
+
+            if self.count_sentence(sentence) is not None:
+                variant_list.append(sentence)
+
+        return variant_list
+
+    def count_sentence(self, sentence):
+        if not sentence.is_valid():
+            return None
+
+        for error in sentence.error_list:
+            self.error_dict[error.error_type_id]["count"] += 1
+
+        self.total_sentence_real += 1
+
+        if sentence.will_have_error:
+            self.total_sentence_with_error += 1
+        else:
+            self.total_sentence_without_error += 1
+
+        return sentence
+
+    def get_m2(self, error_sentence, edit_list):
+        # Format sentence with error and its edits in M2 format
+        edit_data = ""
+        for edit_id_start, edit_id_end, _, _, error_type, original_form in edit_list:
+            edit_data += f"\nA {edit_id_start} {edit_id_end}{error_type}{original_form}|||REQUIRED|||-NONE-|||0"
+
+        return f"S {error_sentence}{edit_data}"
+
 
     def output_dataset(self):
-        
-        output_file_name = self.output_filename[:self.output_filename.rfind(".")]
-        stats_filename = f"{output_file_name}_statistics.txt"
-        txt_original_filename =  f"{output_file_name}_parallel_original.txt"
-        txt_error_filename =  f"{output_file_name}_parallel_error.txt"
-
-        txt_original = []
-        txt_error = []
-
-        result = []
-        for sentence in self.sentence_list:
-            form_list_of_result_tokens = [e.form for e in sentence.token_list]
-
-            txt_original.append(" ".join([form for form in form_list_of_result_tokens if form != ""]))
-            
-            error_result_sentence = "S "
-            edit_data = ""
-            offset_for_edit_id = 0
-            false_sentence = []
-
-            for error in sentence.error_list:
-                # Acquire Error Result Sentence
-                error_id_start = error.original_token_list[0].id
-                error_id_end = error.original_token_list[-1].id
-
-                # First original token will be changed to the error form generated
-                form_list_of_result_tokens[error_id_start] = error.get_error_form()
-                
-                # If original token list is more than 1 token (a phrase),
-                # only put the error change on the first spot (code above),
-                # then the rest will be assigned ""
-                # This is done so error_id will not need offset because appending of data
-                if len(error.original_token_list) > 1:
-                    for i in range(error_id_start + 1, error_id_end + 1):
-                        form_list_of_result_tokens[i] = ""
-
-                # edit data information
-                edit_id_start = error.original_token_list[0].id + offset_for_edit_id
-                edit_id_end = edit_id_start + error.get_len_error_token_list()
-                edit_data += f"\nA {edit_id_start} {edit_id_end}{error.error_type}{error.get_original_form()}|||REQUIRED|||-NONE-|||0"
-
-                # Add offset = length of error - length of original
-                offset_for_edit_id += error.get_edit_offset()
-
-            # Error Result Combination
-            # Remember to remove all the empty strings
-            error_result_temp = " ".join([result for result in form_list_of_result_tokens if result != ""])
-            if len(error_result_temp) > 1:
-                error_result_sentence += error_result_temp[0].upper() + error_result_temp[1:]
-            else:
-                error_result_sentence += error_result_temp
-
-            # Append error result + edit data to result list
-            result.append(f"{error_result_sentence}{edit_data}")
-
-
-            # For the parallel data
-            txt_error.append(error_result_sentence[len("S "):])
-
-
-        # Write Dataset in M2 Format
-        with open(self.output_filename, "w", encoding="ascii") as file_output:
-            file_output.write("\n\n".join(result))
-        
-
-        # Write dataset in parallel sentence format
-        with open(txt_original_filename, "w", encoding="ascii") as file_output:
-            file_output.write("\n".join(txt_original))
-
-        with open(txt_error_filename, "w", encoding="ascii") as file_output:
-            file_output.write("\n".join(txt_error))
-            
-
-        # Write stats of dataset
-        with open(stats_filename, "w", encoding="ascii") as stat_file_output:
-            # Total Data
-            total_data = len(self.sentence_list)
-            total_with_error = len([sentence for sentence in self.sentence_list if sentence.has_error()])
-            total_without_error = len([sentence for sentence in self.sentence_list if not sentence.has_error()])
-            
-            stat_file_output.write(f"Total Kalimat: {total_data}\n")
-            if total_data > 0:
-                stat_file_output.write(f"Total Kalimat dengan Error: {total_with_error} ({total_with_error / total_data * 100:.2f}%)\n")
-                stat_file_output.write(f"Total Kalimat tanpa Error: {total_without_error} ({total_without_error / total_data * 100:.2f}%)\n\n")
-            else:
-                stat_file_output.write(f"Total Kalimat dengan Error: {total_with_error} ({0:.2f}%)\n")
-                stat_file_output.write(f"Total Kalimat tanpa Error: {total_without_error} ({0:.2f}%)\n\n")
-            
-            total_all_error = self.get_total_error()
-
-            # Total Error yang dibangkitkan
-            stat_file_output.write(f"Total Error Dibangkitkan: {total_all_error}\n\n")
-
-            stat_file_output.write(f"Total Tiap Jenis Error:\n")
-            # Number of and percentage of each error type
-            for error_type_id in self.error_dict.keys():
-                total_each_error_type = self.error_dict[error_type_id]["count"]
-                if total_all_error > 0:
-                    ratio_each_error_type = total_each_error_type / total_all_error * 100
-                else:
-                    ratio_each_error_type = 0
-
-                stat_file_output.write(f"- {error_type_id}: {total_each_error_type} ({ratio_each_error_type:.2f}%)\n")
-            
\ No newline at end of file
+        writer = DatasetWriter(self)
+
+        for sentence_record in self.sentence_list:
+            writer.write(*sentence_record)
+
+        writer.close()
@@ -0,0 +1,28 @@
+class CandidateIndex():
+
+    # Inverted index of error candidates: error_type_id -> indexes of sentences
+    # where an error of that type can be made. Sentence indexes are kept in the order added.
+    # Candidates which are only made by chance (probability < 1, ex. most of SPELL) are not indexed,
+    # since the sentence may not produce the error at all
+
+    def __init__(self, error_type_ids):
+        self.__index = {error_type_id: [] for error_type_id in error_type_ids}
+
+    def add_sentence(self, sentence_index, sentence):
+        error_type_ids = set()
+        for candidate in sentence.candidate_list:
+            if candidate.probability < 1:
+                continue
+
+            if candidate.error_type_id not in error_type_ids:
+                error_type_ids.add(candidate.error_type_id)
+                self.__index[candidate.error_type_id].append(sentence_index)
+
+    def get_error_type_ids(self):
+        return list(self.__index.keys())
+
+    def get_sentence_indexes(self, error_type_id):
+        return list(self.__index[error_type_id])
+
+    def get_total_sentence(self, error_type_id):
+        return len(self.__index[error_type_id])
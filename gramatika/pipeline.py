@@ -0,0 +1,150 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import asyncio
+import os
+import random
+
+from .conllu_reader import parse_conllu
+from .writer import DatasetWriter
+
+
+def parse_chunk(text, fast_reader=False):
+    # Run in worker process
+    return parse_conllu(text, fast_reader)
+
+
+class GramatikaPipeline():
+
+    # Three stages connected by bounded queues, so reading, generating and writing overlap
+    # and at most a few chunks are held in memory at the same time:
+    #   1. read chunks of input and parse them in worker processes
+    #   2. generate errors. This stays in one thread because error selection depends on
+    #      error counts of all sentences generated before
+    #   3. write results (and compress them) in a separate thread
+
+    def __init__(self, dataset, chunk_size=1000, queue_size=4, num_workers=None):
+        self.dataset = dataset
+        self.chunk_size = chunk_size
+        self.queue_size = queue_size
+        self.num_workers = num_workers
+
+    def run(self):
+        asyncio.run(self.run_stages())
+
+    def is_done(self):
+        return self.dataset.total_sentence_real == self.dataset.total_sentence
+
+    async def run_stages(self):
+        from tqdm import tqdm
+
+        num_workers = self.num_workers if self.num_workers else os.cpu_count()
+
+        parse_executor = ProcessPoolExecutor(num_workers)
+        read_executor = ThreadPoolExecutor(1)
+        generate_executor = ThreadPoolExecutor(1)
+        write_executor = ThreadPoolExecutor(1)
+
+        # Parse queue holds futures of chunks being parsed, so it has to be
+        # at least as big as the number of workers to keep all of them busy
+        parse_queue = asyncio.Queue(maxsize=max(self.queue_size, num_workers))
+        write_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        writer = DatasetWriter(self.dataset)
+        progress = tqdm(unit=" sentences")
+
+        read_task = asyncio.create_task(self.read_stage(parse_queue, parse_executor, read_executor))
+        write_task = asyncio.create_task(self.write_stage(write_queue, writer, write_executor))
+
+        generate_done = False
+        try:
+            await self.generate_stage(parse_queue, write_queue, generate_executor, progress)
+            generate_done = True
+            await write_task
+        finally:
+            # If generate stage failed, write stage is still waiting for results.
+            # End it so the writer is closed, its own error (if any) is left behind the one raised here
+            if not generate_done and not write_task.done():
+                await write_queue.put(None)
+                await asyncio.gather(write_task, return_exceptions=True)
+
+            read_task.cancel()
+            progress.close()
+            parse_executor.shutdown(cancel_futures=True)
+            read_executor.shutdown()
+            generate_executor.shutdown()
+            write_executor.shutdown()
+
+    async def read_stage(self, parse_queue, parse_executor, read_executor):
+        loop = asyncio.get_running_loop()
+        chunks = self.dataset.iter_input_chunks()
+
+        try:
+            while True:
+                text = await loop.run_in_executor(read_executor, next, chunks, None)
+                if text is None:
+                    break
+
+                await parse_queue.put(loop.run_in_executor(parse_executor, parse_chunk, text, self.dataset.fast_reader))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Pass the error to generate stage, so it does not wait forever
+            future = loop.create_future()
+            future.set_exception(e)
+            await parse_queue.put(future)
+            return
+
+        await parse_queue.put(None)
+
+    async def generate_stage(self, parse_queue, write_queue, generate_executor, progress):
+        loop = asyncio.get_running_loop()
+
+        while not self.is_done():
+            future = await parse_queue.get()
+            if future is None:
+                break
+
+            sentence_conll_list = await future
+            result_list = await loop.run_in_executor(generate_executor, self.generate_chunk, sentence_conll_list)
+            progress.update(len(sentence_conll_list))
+
+            await write_queue.put(result_list)
+
+        await write_queue.put(None)
+
+    def generate_chunk(self, sentence_conll_list):
+        # Shuffle inside the chunk, the whole input is never held in memory to be shuffled
+        random.shuffle(sentence_conll_list)
+
+        result_list = []
+        for sentence_conll in sentence_conll_list:
+            if self.is_done():
+                break
+
+            for sentence in self.dataset.process_sentence_variants(sentence_conll):
+                result_list.append(sentence.get_result())
+
+        return result_list
+
+    async def write_stage(self, write_queue, writer, write_executor):
+        loop = asyncio.get_running_loop()
+        error = None
+
+        while True:
+            result_list = await write_queue.get()
+            if result_list is None:
+                break
+
+            # After an error, keep taking results so generate stage is not blocked
+            if error is not None:
+                continue
+
+            try:
+                await loop.run_in_executor(write_executor, writer.write_all, result_list)
+            except Exception as e:
+                error = e
+
+        await loop.run_in_executor(write_executor, writer.close)
+
+        if error is not None:
+            raise error
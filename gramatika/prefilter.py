@@ -0,0 +1,127 @@
+class SentencePrefilter():
+
+    # Drops sentences of raw CoNLL-U text before they are parsed. Only id, form and upos columns are read.
+    # Sentences which Sentence.has_utf8_encoding_error_or_contain_forbidden_token would reject anyway
+    # are dropped, except when tokens of Sentence can not be known from raw text
+    # ("(" is handled by Sentence.get_bracket_skip_dict, empty nodes are combined like multiword tokens),
+    # those are left to Sentence. Optionally sentences are also dropped by their number of tokens
+    # (a multiword token counts once)
+
+    def __init__(self, min_length=None, max_length=None):
+        self.min_length = min_length
+        self.max_length = max_length
+
+        self.reject_count = {}
+
+    def add_reject(self, reason):
+        self.reject_count[reason] = self.reject_count.get(reason, 0) + 1
+
+    def get_total_reject(self):
+        return sum(self.reject_count.values())
+
+    def filter_text(self, text):
+        # Return text without rejected sentences, kept sentences are not changed
+        kept_block_list = []
+        block_lines = []
+
+        for line in text.split("\n"):
+            if line.strip() == "":
+                if block_lines:
+                    if self.is_kept(block_lines):
+                        kept_block_list.append("\n".join(block_lines))
+                    block_lines = []
+            else:
+                block_lines.append(line)
+
+        if block_lines and self.is_kept(block_lines):
+            kept_block_list.append("\n".join(block_lines))
+
+        if not kept_block_list:
+            return ""
+        return "\n\n".join(kept_block_list) + "\n\n"
+
+    def get_tokens(self, block_lines):
+        # (form, upos) of tokens as Sentence.init_token_list makes them,
+        # and whether forbidden token rules can be checked on them.
+        # None if the block is not in the usual tab separated format, it is left to the parser
+        token_list = []
+        is_checkable = True
+        skip_it = 0
+
+        for line in block_lines:
+            line = line.strip()
+            if line[0] == "#":
+                continue
+
+            # conllu also splits columns at two or more spaces
+            if "  " in line:
+                return None, False
+
+            columns = line.split("\t")
+            if len(columns) < 4:
+                return None, False
+
+            token_id, form, upos = columns[0], columns[1], columns[3]
+
+            if skip_it > 0:
+                # Child of multiword token, its upos is used by the multiword token
+                if len(token_list) > 0 and token_list[-1][1] is None:
+                    token_list[-1] = (token_list[-1][0], upos)
+                skip_it -= 1
+                continue
+
+            if form == "(" or "." in token_id:
+                is_checkable = False
+
+            if len(form) == 0:
+                continue
+
+            if "-" in token_id:
+                start_id, end_id = token_id.split("-")
+                skip_it = int(end_id) - int(start_id) + 1
+                token_list.append((form, None))
+            else:
+                token_list.append((form, upos))
+
+        return token_list, is_checkable
+
+    def get_reject_reason(self, block_lines):
+        token_list, is_checkable = self.get_tokens(block_lines)
+        if token_list is None:
+            return None
+
+        if self.min_length is not None and len(token_list) < self.min_length:
+            return "too_short"
+        if self.max_length is not None and len(token_list) > self.max_length:
+            return "too_long"
+
+        if not is_checkable:
+            return None
+
+        # Sentence without tokens never has errors
+        if len(token_list) == 0:
+            return "empty"
+
+        # Same order of checks as in Sentence.has_utf8_encoding_error_or_contain_forbidden_token
+        for token_idx, (form, upos) in enumerate(token_list):
+            if token_idx != len(token_list)-1 and "?" in form:
+                return "encoding_error"
+            elif form in ["gt", "lt"]:
+                return "forbidden_token"
+
+        first_form = token_list[0][0]
+        if first_form[0].islower() or first_form[0] in ["(", ")", "[", "]", "{", "}", "-"]:
+            return "first_token"
+
+        if token_list[-1][1] != 'PUNCT':
+            return "last_token_not_punct"
+
+        return None
+
+    def is_kept(self, block_lines):
+        reason = self.get_reject_reason(block_lines)
+        if reason is None:
+            return True
+
+        self.add_reject(reason)
+        return False
@@ -0,0 +1,93 @@
+from importlib import import_module
+
+
+# Built in error generators, error_type_id -> "module:class"
+# Classes are only imported when their error type is used
+ERROR_CLASS_PATHS = {
+    "ADJ" : "gramatika.error:AdjectiveError",
+    "ADV" : "gramatika.error:AdverbError",
+    "CONJ" : "gramatika.error:ConjunctionError",
+    "DET" : "gramatika.error:DeterminerError",
+    "MORPH" : "gramatika.error:MorphologyError",
+    "NOUN" : "gramatika.error:NounError",
+    "NOUN:INFL" : "gramatika.error:NounInflectionError",
+    "ORTH" : "gramatika.error:OrthographyError",
+    "PART" : "gramatika.error:ParticleError",
+    "PREP" : "gramatika.error:PrepositionError",
+    "PRON" : "gramatika.error:PronounError",
+    "PUNCT" : "gramatika.error:PunctuationError",
+    "SPELL" : "gramatika.error:SpellingError",
+    "VERB" : "gramatika.error:VerbError",
+    "VERB:INFL" : "gramatika.error:VerbInflectionError",
+    "VERB:TENSE" : "gramatika.error:VerbTenseError",
+    "WO" : "gramatika.error:WordOrderError",
+}
+
+# External packages can add error generators by declaring entry points in this group,
+# with the error_type_id as name and "module:class" as value
+ENTRY_POINT_GROUP = "gramatika.errors"
+
+
+class ErrorRegistry():
+
+    def __init__(self, discover_entry_points=True):
+        self.__error_class_paths = dict(ERROR_CLASS_PATHS)
+        self.__error_classes = {}
+
+        if discover_entry_points:
+            self.discover_entry_points()
+
+    def discover_entry_points(self):
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            self.register(entry_point.name, entry_point.value)
+
+    def register(self, error_type_id, error_class):
+        # error_class can be the class itself or its "module:class" path
+        if isinstance(error_class, str):
+            self.__error_class_paths[error_type_id] = error_class
+            self.__error_classes.pop(error_type_id, None)
+        else:
+            self.__error_class_paths[error_type_id] = f"{error_class.__module__}:{error_class.__qualname__}"
+            self.__error_classes[error_type_id] = error_class
+
+    def get_error_type_ids(self):
+        return list(self.__error_class_paths.keys())
+
+    def has_error_type(self, error_type_id):
+        return error_type_id in self.__error_class_paths
+
+    def select_error_type_ids(self, error_types=None, exclude_error_types=None, error_type_weights=None):
+        # Error types enabled for a run, all of them if error_types is empty.
+        # Raises ValueError for unknown error types, empty selection or weights which are not positive
+        error_type_ids = error_types if error_types else self.get_error_type_ids()
+        if exclude_error_types:
+            error_type_ids = [error_type_id for error_type_id in error_type_ids if error_type_id not in exclude_error_types]
+
+        error_type_weights = error_type_weights if error_type_weights else {}
+
+        for error_type_id in list(error_type_ids) + list(exclude_error_types or []) + list(error_type_weights.keys()):
+            if not self.has_error_type(error_type_id):
+                raise ValueError(f"Unknown error type {error_type_id}, available error types: {', '.join(self.get_error_type_ids())}")
+
+        if len(error_type_ids) == 0:
+            raise ValueError("At least one error type should be enabled")
+
+        for error_type_id, weight in error_type_weights.items():
+            if weight <= 0:
+                raise ValueError(f"Weight of error type {error_type_id} should be more than 0")
+
+        return error_type_ids
+
+    def load(self, error_type_id):
+        if error_type_id not in self.__error_classes:
+            module_name, _, class_name = self.__error_class_paths[error_type_id].partition(":")
+            error_class = getattr(import_module(module_name), class_name)
+
+            if error_class.error_type_id != error_type_id:
+                raise ValueError(f"{class_name} has error_type_id {error_class.error_type_id}, registered as {error_type_id}")
+
+            self.__error_classes[error_type_id] = error_class
+
+        return self.__error_classes[error_type_id]
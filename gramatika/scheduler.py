@@ -0,0 +1,133 @@
+import math
+
+
+class QuotaScheduler():
+
+    # Plans how many errors of each type the dataset should have (quota), from the error candidates
+    # found in input, instead of greedily checking the ratio of errors generated so far:
+    #   - quota of each type is its share of the expected total errors (by weight, at most max_ratio),
+    #     but not more than its candidates in input. What rare types can not fill goes to the others
+    #   - sentences with candidates of the scarcest types are generated first
+    #   - errors of types whose quota is filled are only generated in sentences without any other error
+    # Candidates are counted per sentence and counts are simply added up,
+    # so counting can be split over chunks or shards of input
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+        self.candidate_count = {error_type_id: 0 for error_type_id in dataset.error_dict.keys()}
+        self.target_count = {error_type_id: 0 for error_type_id in dataset.error_dict.keys()}
+
+    def count_candidates(self, sentence):
+        # Expected number of errors each type can have in sentence
+        candidate_count = {}
+        for candidate in sentence.candidate_list:
+            candidate_count[candidate.error_type_id] = candidate_count.get(candidate.error_type_id, 0) + candidate.probability
+
+        # Only max_same_error_in_sentence errors of the same type are kept in a sentence
+        for error_type_id in candidate_count.keys():
+            candidate_count[error_type_id] = min(candidate_count[error_type_id], self.dataset.max_same_error_in_sentence)
+
+        return candidate_count
+
+    def add_candidate_count(self, candidate_count):
+        for error_type_id, count in candidate_count.items():
+            self.candidate_count[error_type_id] += count
+
+    def get_expected_total_error(self, total_sentence):
+        # Sentences with error get randrange(1, max_error_in_sentence + 1) errors on average
+        dataset = self.dataset
+        total_sentence_with_error = total_sentence * (1 - dataset.no_error_sentence_ratio)
+        return total_sentence_with_error * (1 + dataset.max_error_in_sentence) / 2
+
+    def plan(self, total_sentence):
+        error_dict = self.dataset.error_dict
+        total_error = self.get_expected_total_error(total_sentence)
+
+        # Maximum of each type is the smaller one of its candidates in input and max_ratio of total errors
+        maximum_count = {}
+        for error_type_id in error_dict.keys():
+            error_class = error_dict[error_type_id]["class"]
+            share_limit = error_class.max_ratio * error_dict[error_type_id]["weight"] * total_error
+            maximum_count[error_type_id] = min(self.candidate_count[error_type_id], share_limit)
+
+        # Share the total errors by weight. Types which reach their maximum keep it,
+        # and the rest of total errors is shared again among the other types
+        target_count = {}
+        remaining_ids = list(error_dict.keys())
+        remaining_error = total_error
+        while remaining_ids:
+            remaining_weight = sum([error_dict[error_type_id]["weight"] for error_type_id in remaining_ids])
+
+            limited_ids = [
+                error_type_id for error_type_id in remaining_ids
+                if maximum_count[error_type_id] <= remaining_error * error_dict[error_type_id]["weight"] / remaining_weight
+            ]
+
+            if not limited_ids:
+                for error_type_id in remaining_ids:
+                    target_count[error_type_id] = remaining_error * error_dict[error_type_id]["weight"] / remaining_weight
+                break
+
+            for error_type_id in limited_ids:
+                target_count[error_type_id] = maximum_count[error_type_id]
+                remaining_error -= maximum_count[error_type_id]
+                remaining_ids.remove(error_type_id)
+
+        self.target_count = {error_type_id: math.ceil(target_count[error_type_id]) for error_type_id in error_dict.keys()}
+
+    def get_scarcity(self, error_type_id):
+        # Share of candidates in input needed to fill the quota of error type
+        if self.candidate_count[error_type_id] > 0:
+            return self.target_count[error_type_id] / self.candidate_count[error_type_id]
+        else:
+            return 0
+
+    def order_sentences(self, sentence_list, candidate_count_list):
+        # Sentences whose candidates are needed the most go first.
+        # Sort is stable, so sentences with the same score stay in their (shuffled) order
+        scarcity = {error_type_id: self.get_scarcity(error_type_id) for error_type_id in self.target_count.keys()}
+        score_list = [
+            sum([count * scarcity[error_type_id] for error_type_id, count in candidate_count.items()])
+            for candidate_count in candidate_count_list
+        ]
+
+        order = sorted(range(len(sentence_list)), key=lambda idx: score_list[idx], reverse=True)
+        return [sentence_list[idx] for idx in order]
+
+    def schedule(self, sentence_list, total_sentence):
+        # Plan quotas from candidates of all sentences, then return sentences in the order to be generated
+        candidate_count_list = []
+        for sentence in sentence_list:
+            candidate_count = self.count_candidates(sentence)
+            candidate_count_list.append(candidate_count)
+
+            # Invalid sentences (and sentences without tokens) are never saved, their candidates can not be used
+            if sentence.len() > 0 and not sentence.has_utf8_encoding_error_or_contain_forbidden_token():
+                self.add_candidate_count(candidate_count)
+
+        self.plan(total_sentence)
+
+        return self.order_sentences(sentence_list, candidate_count_list)
+
+    def get_fill_ratio(self, error_type_id):
+        count = self.dataset.error_dict[error_type_id]["count"]
+        target = self.target_count[error_type_id]
+
+        if target > 0:
+            return count / target
+        else:
+            return math.inf
+
+    def is_below_quota(self, error_type_id):
+        return self.get_fill_ratio(error_type_id) < 1
+
+    def filter_by_quota(self, error_list):
+        # Expected total errors is only an estimate, so quotas may be filled before total_sentence is reached.
+        # A sentence whose errors are all over quota still gets them (least filled first, see clean_collisions),
+        # rather than being thrown away
+        error_list_below_quota = [error for error in error_list if self.is_below_quota(error.error_type_id)]
+        if len(error_list_below_quota) > 0:
+            return error_list_below_quota
+        else:
+            return error_list
@@ -1,23 +1,91 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import math
 import random
+import sys
+
+
+# What is kept of an accepted sentence until it is written: forms and edits only,
+# without references to conllu tokens, Token and Error objects or dataset
+SentenceRecord = namedtuple("SentenceRecord", ["original_sentence", "error_sentence", "edit_list"])
+
+# Maximum number of distinct Morf strings whose parsed segments are cached
+MORF_CACHE_SIZE = 131072
 
 
 class Sentence():
     
-    def __init__(self, sentence_conll, dataset):
+    def __init__(self, sentence_conll, dataset, with_error=True):
         self.sentence_conll = sentence_conll
         self.dataset = dataset
         self.token_list = []
+        self.candidate_list = []
         self.error_list = []
         self.valid = False
         self.will_have_error = False
 
-        self.init_token_list()
+        # Sentence can be only tokenized, ex. to collect its lemmas
+        if not with_error:
+            self.init_token_list()
+            return
+
+        # Errors are generated in two phases:
+        #   1. enumerate candidates of all errors which can be made in sentence (deterministic)
+        #   2. sample errors from the candidates, under ratio and maximum error constraints
+        # Error types which reached their max_ratio are skipped in both phases
+        saturated_error_type_ids = dataset.get_saturated_error_type_ids()
+
+        # Sentence which will have no errors only needs to find one error which could have been made,
+        # candidates are made lazily until then (see generate_no_error)
+        if dataset.sentence_cache is None and dataset.is_sentence_without_error_needed():
+            self.init_token_list()
+            self.candidate_list = None
+            self.generate_error(saturated_error_type_ids)
+            return
+
+        self.init_candidates(saturated_error_type_ids)
+        self.generate_error(saturated_error_type_ids)
+
+    def init_candidates(self, skipped_error_type_ids=frozenset()):
+        # Tokens were already made if sentence was created without error
+        self.token_list = []
+        self.candidate_list = []
+
+        dataset = self.dataset
+        sentence_cache = dataset.sentence_cache
+        error_type_ids = {error_type_id for error_type_id in dataset.error_dict.keys() if error_type_id not in skipped_error_type_ids}
+
+        if sentence_cache is None:
+            self.init_token_list()
+            self.init_candidate_list(error_type_ids)
+            return
+
+        # Repeated sentence reuses tokens and candidates of the previous one
+        cache_key = sentence_cache.get_key(self.sentence_conll)
+        cache_entry = sentence_cache.get(cache_key)
 
-        self.generate_error()
+        if cache_entry is not None and error_type_ids <= cache_entry["error_type_ids"]:
+            # Entries loaded from cache file only have candidates, their tokens are made once here
+            if cache_entry["token_list"] is None:
+                self.init_token_list()
+                cache_entry["token_list"] = self.token_list
+
+            self.token_list = cache_entry["token_list"]
+            self.candidate_list = [candidate for candidate in cache_entry["candidate_list"] if candidate.error_type_id in error_type_ids]
+        else:
+            self.init_token_list()
+            self.init_candidate_list(error_type_ids)
+            sentence_cache.put(cache_key, {
+                "token_list" : self.token_list,
+                "candidate_list" : self.candidate_list,
+                "error_type_ids" : error_type_ids,
+            })
 
     def init_token_list(self):
         skip_it = 0
         token_index = 0
+        bracket_skip_dict = self.get_bracket_skip_dict()
 
         for token_id in range(len(self.sentence_conll)):
             # Skip iterations by skip_it value
@@ -32,38 +100,9 @@ class Sentence():
                 continue
 
             # Handle ()
-            if token["form"] == "(":
-                has_special_symbols = False
-                nested = 0
-                len_sentence = len(self.sentence_conll)
-                offset = 1
-                token_after = self.sentence_conll[token_id+offset]
-
-                while (token_after["form"] != ")" or nested > 0) and token_id+offset < len_sentence:
-                    if token_after["form"] == "(":
-                        nested += 1
-
-                    if token_after["form"] == ")" and nested > 0:
-                        nested -= 1
-
-                    if token_after["form"] in [";", ","]:
-                        has_special_symbols = True
-
-                    offset += 1
-                    if token_id+offset < len_sentence:
-                        token_after = self.sentence_conll[token_id+offset]
-
-                # Skip the () if condition fulfilled
-                if offset == 1 and token_after["form"] == ")":
-                    skip_it = 1
-                    continue
-                elif token_id+offset >= len_sentence:
-                    skip_it = offset - 1
-                    continue
-                elif has_special_symbols:
-                    skip_it = offset
-                    continue
-
+            if token_id in bracket_skip_dict:
+                skip_it = bracket_skip_dict[token_id]
+                continue
 
             if isinstance(token["id"], tuple):
                 # If token type tuple, combine all child token to one Token instance
@@ -99,6 +138,43 @@ class Sentence():
 
             token_index += 1
 
+    def get_bracket_skip_dict(self):
+        # Number of rows skipped after each "(" which is removed together with what follows:
+        #   - "()" is removed
+        #   - "(" without matching ")" is removed with the rest of sentence
+        #   - "( ... )" with ";" or "," inside is removed
+        # Other "(" are kept as tokens. Matching ")" of all "(" are found in one pass with a stack
+        open_stack = []
+        close_id_dict = {}
+        open_id_list = []
+        special_count_list = [0] # number of ";" and "," before each row
+
+        for token_id, token in enumerate(self.sentence_conll):
+            form = token["form"]
+
+            if form == "(":
+                open_stack.append(token_id)
+                open_id_list.append(token_id)
+            elif form == ")" and open_stack:
+                close_id_dict[open_stack.pop()] = token_id
+
+            special_count_list.append(special_count_list[-1] + (form in [";", ","]))
+
+        len_sentence = len(self.sentence_conll)
+        bracket_skip_dict = {}
+
+        for open_id in open_id_list:
+            close_id = close_id_dict.get(open_id)
+
+            if close_id is None:
+                bracket_skip_dict[open_id] = len_sentence - open_id - 1
+            elif close_id == open_id + 1:
+                bracket_skip_dict[open_id] = 1
+            elif special_count_list[close_id] - special_count_list[open_id + 1] > 0:
+                bracket_skip_dict[open_id] = close_id - open_id
+
+        return bracket_skip_dict
+
     def get_token_by_id(self, id):
         return self.token_list[id]
     
@@ -133,20 +209,65 @@ class Sentence():
         return False
 
 
-    def generate_error(self):
-        for token in self.token_list:
-            dataset_error_dict = self.dataset.error_dict
+    def init_candidate_list(self, error_type_ids):
+        self.candidate_list.extend(self.iter_candidates(error_type_ids))
+
+    def iter_candidates(self, error_type_ids):
+        dataset_error_dict = self.dataset.error_dict
 
-            # Try to generate all error for this particular token in sentence
-            # If error generated not valid, then don't save to list
-            for error_type_id in dataset_error_dict.keys():
-                error = dataset_error_dict[error_type_id]["class"](
+        # Keep the order of error types in dataset
+        error_type_ids = [error_type_id for error_type_id in dataset_error_dict.keys() if error_type_id in error_type_ids]
+
+        for token in self.token_list:
+            # Get candidate of all error types for this particular token in sentence
+            for error_type_id in error_type_ids:
+                candidate = dataset_error_dict[error_type_id]["class"].get_candidate(
                     token=token,
                     sentence=self,
                 )
 
-                if error.is_valid():
-                    self.error_list.append(error)
+                if candidate is not None:
+                    yield candidate
+
+    def generate_error(self, saturated_error_type_ids=None):
+        dataset_error_dict = self.dataset.error_dict
+
+        # Errors can be sampled again from the same candidates
+        self.error_list = []
+        self.valid = False
+        self.will_have_error = False
+
+        if saturated_error_type_ids is None:
+            saturated_error_type_ids = self.dataset.get_saturated_error_type_ids()
+
+        for error_type_id in saturated_error_type_ids:
+            dataset_error_dict[error_type_id]["skip_count"] += 1
+
+        if self.dataset.is_sentence_without_error_needed():
+            self.generate_no_error(saturated_error_type_ids)
+            return
+
+        # Candidates were not made yet if sentence was going to have no errors when it was created
+        if self.candidate_list is None:
+            self.init_candidates(saturated_error_type_ids)
+
+        candidate_list = [candidate for candidate in self.candidate_list if candidate.error_type_id not in saturated_error_type_ids]
+        chosen_candidate_indexes = self.choose_candidates_by_chance(candidate_list)
+
+        # Make errors from candidates by random choice
+        # If error generated not valid, then don't save to list
+        for candidate_index, candidate in enumerate(candidate_list):
+            error_class = dataset_error_dict[candidate.error_type_id]["class"]
+
+            if candidate.probability < 1:
+                if candidate_index not in chosen_candidate_indexes:
+                    continue
+                error = error_class.make(candidate=candidate, sentence=self)
+            else:
+                error = error_class.sample(candidate=candidate, sentence=self)
+
+            if error is not None and error.is_valid():
+                self.error_list.append(error)
 
         # filter error generated which has more than max_ratio allowed
         self.filter_by_max_ratio()
@@ -159,7 +280,55 @@ class Sentence():
         
         self.clean_generated_error()
 
-    
+
+    def choose_candidates_by_chance(self, candidate_list):
+        # Indexes of candidates made only by chance (probability < 1, ex. SPELL) which are made this time.
+        # Rather than one random draw for each candidate, the number of candidates of the same probability
+        # skipped before the next one is made is drawn from geometric distribution,
+        # so random is called about once for each error made instead of once for each token
+        candidate_indexes_by_probability = {}
+        for candidate_index, candidate in enumerate(candidate_list):
+            if candidate.probability < 1:
+                candidate_indexes_by_probability.setdefault(candidate.probability, []).append(candidate_index)
+
+        chosen_candidate_indexes = set()
+        for probability, candidate_indexes in candidate_indexes_by_probability.items():
+            position = self.get_geometric_gap(probability)
+            while position < len(candidate_indexes):
+                chosen_candidate_indexes.add(candidate_indexes[position])
+                position += 1 + self.get_geometric_gap(probability)
+
+        return chosen_candidate_indexes
+
+    @staticmethod
+    def get_geometric_gap(probability):
+        # Number of failed trials before the first success, each succeeding with probability
+        return int(math.log(1.0 - random.random()) / math.log(1.0 - probability))
+
+    def generate_no_error(self, saturated_error_type_ids):
+        # Sentence will have no errors, but like in generate_error it is only valid
+        # if at least one error could have been made, so sampling stops at the first one.
+        # Errors of saturated error types would be filtered by max ratio, other errors are kept by filter_by_max_ratio
+        if self.len() == 0 or self.has_utf8_encoding_error_or_contain_forbidden_token():
+            return
+
+        error_type_ids = {error_type_id for error_type_id in self.dataset.error_dict.keys() if error_type_id not in saturated_error_type_ids}
+
+        if self.candidate_list is None:
+            candidates = self.iter_candidates(error_type_ids)
+        else:
+            candidates = (candidate for candidate in self.candidate_list if candidate.error_type_id in error_type_ids)
+
+        for candidate in candidates:
+            error = self.dataset.error_dict[candidate.error_type_id]["class"].sample(
+                candidate=candidate,
+                sentence=self,
+            )
+
+            if error is not None and error.is_valid() and error.get_original_form() != error.get_error_form():
+                self.valid = True
+                return
+
     def clean_generated_error(self):
         self.clean_collisions()
         self.clean_maximum_error_types_in_sentence()
@@ -167,6 +336,10 @@ class Sentence():
         self.resort_for_output()
 
     def filter_by_max_ratio(self):
+        if self.dataset.scheduler is not None:
+            self.error_list = self.dataset.scheduler.filter_by_quota(self.error_list)
+            return
+
         self.error_list = [error for error in self.error_list if error.is_below_max_ratio()]
 
     def remove_error_which_is_equal_to_token(self):
@@ -221,16 +394,12 @@ class Sentence():
         # Sort by ratio (ascending)
         self.error_list.sort(key=lambda error : error.get_ratio())
 
-        # Will this sentence have error or not based on args.no_error_sentence_ratio
-        if self.dataset.total_sentence_real > 25 and self.dataset.total_sentence_without_error/self.dataset.total_sentence_real < self.dataset.no_error_sentence_ratio:
-            # Will have no errors
-            max_error_this_sentence = 0
-            self.will_have_error = False
-        else:
-            # Get amount of errors picked in this sentence randomly,
-            # in the range of allowed args.max_error_in_sentence
-            max_error_this_sentence = random.randrange(1, self.dataset.max_error_in_sentence+1)
-            self.will_have_error = True
+        # Sentences which will have no errors based on args.no_error_sentence_ratio
+        # do not get here, see generate_no_error.
+        # Get amount of errors picked in this sentence randomly,
+        # in the range of allowed args.max_error_in_sentence
+        max_error_this_sentence = random.randrange(1, self.dataset.max_error_in_sentence+1)
+        self.will_have_error = True
 
         # Only add errors according to the random number above
         # starting with the least in ratio (most needed)
@@ -239,6 +408,51 @@ class Sentence():
     def resort_for_output(self):
         self.error_list.sort(key=lambda error : [token.id for token in error.original_token_list])
 
+    def get_result(self):
+        # Get original sentence, sentence with error,
+        # and list of edit (error_start, error_end, original_start, original_end, error_type, original_form)
+        # where error_start and error_end are token positions in sentence with error
+        form_list_of_result_tokens = [token.form for token in self.token_list]
+
+        original_sentence = " ".join([form for form in form_list_of_result_tokens if form != ""])
+
+        edit_list = []
+        offset_for_edit_id = 0
+
+        for error in self.error_list:
+            # Acquire Error Result Sentence
+            error_id_start = error.original_token_list[0].id
+            error_id_end = error.original_token_list[-1].id
+
+            # First original token will be changed to the error form generated
+            form_list_of_result_tokens[error_id_start] = error.get_error_form()
+
+            # If original token list is more than 1 token (a phrase),
+            # only put the error change on the first spot (code above),
+            # then the rest will be assigned ""
+            # This is done so error_id will not need offset because appending of data
+            if len(error.original_token_list) > 1:
+                for i in range(error_id_start + 1, error_id_end + 1):
+                    form_list_of_result_tokens[i] = ""
+
+            # edit data information
+            edit_id_start = error_id_start + offset_for_edit_id
+            edit_id_end = edit_id_start + error.get_len_error_token_list()
+            edit_list.append((edit_id_start, edit_id_end, error_id_start, error_id_end + 1, error.error_type, error.get_original_form()))
+
+            # Add offset = length of error - length of original
+            offset_for_edit_id += error.get_edit_offset()
+
+        # Error Result Combination
+        # Remember to remove all the empty strings
+        error_result_temp = " ".join([result for result in form_list_of_result_tokens if result != ""])
+        if len(error_result_temp) > 1:
+            error_sentence = error_result_temp[0].upper() + error_result_temp[1:]
+        else:
+            error_sentence = error_result_temp
+
+        return original_sentence, error_sentence, edit_list
+
 
 
 
@@ -254,30 +468,18 @@ class Sentence():
                 
                 morf_list = []
                 for child in token_childs:
-                    child_morf_conllu = child["misc"]["Morf"]
-
-                    # Clean morf string from conllu format (remove '<UPOS>_UPOS')
-                    child_morf_cleaned = child_morf_conllu.split("+")
-                    for morf_part_idx in range(len(child_morf_cleaned)):
-                        child_morf_cleaned[morf_part_idx] = child_morf_cleaned[morf_part_idx].split("<")[0].split("_")[0]
+                    morf_list.extend(self.parse_morf(child["misc"]["Morf"]))
 
-                    morf_list.extend(child_morf_cleaned)
-
-                self.__morf = morf_list
+                self.__morf = tuple(morf_list)
 
             else: # token is not type tuple
                 self.__token_conll = token_conll
                 self.__form = self.token_conll["form"]
 
-                morf_list = []
-                # Clean morf string from conllu format (remove '<UPOS>_UPOS')
                 if token_conll["misc"]["Morf"]:
-                    for morf_part in token_conll["misc"]["Morf"].split("+"):
-                        morf_list.append(morf_part.split("<")[0].split("_")[0])
+                    self.__morf = self.parse_morf(token_conll["misc"]["Morf"])
                 else:
-                    morf_list.append("")
-
-                self.__morf = morf_list
+                    self.__morf = ("",)
 
             # SpaceAfter Attribute
             if 'SpaceAfter' in self.token_conll['misc'] and self.token_conll['misc']['SpaceAfter'] == "No":
@@ -285,6 +487,13 @@ class Sentence():
             else:
                 self.__space_after = True
 
+        @staticmethod
+        @lru_cache(maxsize=MORF_CACHE_SIZE)
+        def parse_morf(morf_conllu):
+            # Clean morf string from conllu format (remove '<UPOS>_UPOS'),
+            # segments are interned as the same ones repeat across tokens
+            return tuple(sys.intern(morf_part.split("<")[0].split("_")[0]) for morf_part in morf_conllu.split("+"))
+
         @property
         def token_conll(self):
             return self.__token_conll
@@ -307,7 +516,8 @@ class Sentence():
         
         @property
         def xpos(self):
-            return self.token_conll["xpos"]
+            # Not kept by the fast reader (see conllu_reader)
+            return self.token_conll.get("xpos")
         
         @property
         def feats(self):
@@ -323,7 +533,8 @@ class Sentence():
         
         @property
         def deps(self):
-            return self.token_conll["deps"]
+            # Not kept by the fast reader (see conllu_reader)
+            return self.token_conll.get("deps")
         
         @property
         def morf(self):
@@ -334,4 +545,8 @@ class Sentence():
             return self.__space_after
         
         def __str__(self):
-            return self.form
\ No newline at end of file
+            return self.form
+
+    def get_record(self):
+        original_sentence, error_sentence, edit_list = self.get_result()
+        return SentenceRecord(original_sentence, error_sentence, tuple(edit_list))
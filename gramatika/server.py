@@ -0,0 +1,118 @@
+import json
+import os
+import socketserver
+import sys
+import threading
+
+from .conllu_reader import parse_conllu
+
+
+# Protocol: one JSON object per line in both directions.
+#
+#   request  : {"id": any, "conllu": "<one or more sentences in CoNLL-U format>"}
+#   response : {"id": any, "results": [{"original": str, "error": str, "m2": str,
+#                                        "edits": [[error_start, error_end, original_start, original_end, error_type, original_form], ...]}],
+#               "invalid": <number of sentences which are not valid to be saved>}
+#              error_type of edit is the type name without M2 delimiters, ex. "R:NOUN"
+#
+#   request  : {"id": any, "statistics": true}
+#   response : {"id": any, "total_sentence": int, "error_count": {error_type_id: int}}
+#
+# Invalid requests are answered with {"id": any, "error": "<message>"}
+
+
+class GramatikaServer():
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+        # Generating errors reads and updates dataset state (error counts, random state),
+        # so sentences are processed one at a time
+        self.lock = threading.Lock()
+
+        # Load thesaurus before the first request comes
+        self.dataset.get_sinonim_dict().get_sinonim_table()
+
+    def handle_request(self, request):
+        if request.get("statistics"):
+            with self.lock:
+                return {
+                    "id" : request.get("id"),
+                    "total_sentence" : self.dataset.total_sentence_real,
+                    "error_count" : {error_type_id: error_type["count"] for error_type_id, error_type in self.dataset.error_dict.items()},
+                }
+
+        sentence_conll_list = parse_conllu(request["conllu"], self.dataset.fast_reader)
+
+        results = []
+        invalid = 0
+        for sentence_conll in sentence_conll_list:
+            with self.lock:
+                sentence = self.dataset.process_sentence(sentence_conll)
+
+            if sentence is None:
+                invalid += 1
+                continue
+
+            original_sentence, error_sentence, edit_list = sentence.get_result()
+            results.append({
+                "original" : original_sentence,
+                "error" : error_sentence,
+                "m2" : self.dataset.get_m2(error_sentence, edit_list),
+                "edits" : [
+                    [error_start, error_end, original_start, original_end, error_type.strip("|"), original_form]
+                    for error_start, error_end, original_start, original_end, error_type, original_form in edit_list
+                ],
+            })
+
+        return {
+            "id" : request.get("id"),
+            "results" : results,
+            "invalid" : invalid,
+        }
+
+    def handle_line(self, line):
+        request = {}
+        try:
+            request = json.loads(line)
+            response = self.handle_request(request)
+        except Exception as e:
+            response = {
+                "id" : request.get("id") if isinstance(request, dict) else None,
+                "error" : f"{type(e).__name__}: {e}",
+            }
+
+        return json.dumps(response)
+
+    def serve_stdio(self, file_input=None, file_output=None):
+        file_input = sys.stdin if file_input is None else file_input
+        file_output = sys.stdout if file_output is None else file_output
+
+        for line in file_input:
+            if not line.strip():
+                continue
+
+            file_output.write(self.handle_line(line) + "\n")
+            file_output.flush()
+
+    def serve_unix_socket(self, socket_path):
+        server = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+
+                    self.wfile.write((server.handle_line(line) + "\n").encode("utf-8"))
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        with socketserver.ThreadingUnixStreamServer(socket_path, RequestHandler) as socket_server:
+            socket_server.daemon_threads = True
+            try:
+                socket_server.serve_forever()
+            finally:
+                os.remove(socket_path)
@@ -1,8 +1,19 @@
 
-from Levenshtein import distance
-
 import json
-import sys
+import os
+
+
+# Parts of speech whose errors are made from synonyms
+SINONIM_UPOS = ("ADJ", "ADV", "NOUN", "VERB")
+
+# "tag" of thesaurus entry (ex. "n" in Tesaurus Tematis) -> UPOS
+TAG_UPOS = {
+    "a" : "ADJ",
+    "adj" : "ADJ",
+    "adv" : "ADV",
+    "n" : "NOUN",
+    "v" : "VERB",
+}
 
 
 class Tesaurus():
@@ -10,12 +21,18 @@ class Tesaurus():
     def __init__(self, sinonim_file):
         self.sinonim_file = sinonim_file
         self.__sinonim_dict = None
+        self.__similarity_keys = None
+        self.__morphology_table = None
+        self.__sinonim_table = None
+
+    def get_filename(self):
+        return "tesaurus/sinonim.json" if self.sinonim_file is None else self.sinonim_file
 
     def get_sinonim_dict(self):
         
         if self.__sinonim_dict is None:
             # initialize sinonim_dict if is None
-            filename = "tesaurus/sinonim.json" if self.sinonim_file is None else self.sinonim_file
+            filename = self.get_filename()
 
             with open(filename) as sinonim_file:
                 sinonim_data = json.load(sinonim_file)	
@@ -32,17 +49,171 @@ class Tesaurus():
         
         return []
     
+    def get_entry_upos(self, entry):
+        # UPOS the synonyms of thesaurus entry can be used for,
+        # all of SINONIM_UPOS if entry has no tag or its tag is not known
+        tags = entry.get("tag")
+        if tags is None:
+            return SINONIM_UPOS
+        if isinstance(tags, str):
+            tags = [tags]
+
+        upos_list = []
+        for tag in tags:
+            upos = tag.upper() if tag.upper() in SINONIM_UPOS else TAG_UPOS.get(tag.lower())
+            if upos is None:
+                return SINONIM_UPOS
+            upos_list.append(upos)
+
+        return tuple(upos_list)
+
+    def get_sinonim_table(self):
+        # (word, upos) -> synonyms of word already split into tokens, as tuple of tuples.
+        # Words without any synonym are left out. Empty synonyms ("") are kept, so random choice
+        # among synonyms draws from the same list as get_sinonim
+        if self.__sinonim_table is None:
+            sinonim_table = {}
+
+            for word, entry in self.get_sinonim_dict().items():
+                sinonim_tokens = tuple([tuple(sinonim.split(" ")) for sinonim in entry['sinonim']])
+                if len(sinonim_tokens) == 0:
+                    continue
+
+                for upos in self.get_entry_upos(entry):
+                    sinonim_table[(word, upos)] = sinonim_tokens
+
+            self.__sinonim_table = sinonim_table
+
+        return self.__sinonim_table
+
+    def get_sinonim_tokens(self, word, upos):
+        # Split synonyms of word used as upos, empty tuple if there is none
+        return self.get_sinonim_table().get((word, upos), ())
+
+    def get_similarity_keys(self):
+        # Keys searched by get_most_similar, in the same order as in sinonim_dict
+        if self.__similarity_keys is None:
+            self.__similarity_keys = list(self.get_sinonim_dict().keys())
+
+        return self.__similarity_keys
+
     def get_most_similar(self, word):
-        most_similar = sys.maxsize
-        string_similar = ""
-        sinonim_dict = self.get_sinonim_dict()
+        # Get key with the smallest Levenshtein distance to word,
+        # the first one in sinonim_dict if there are some with the same distance
+        from rapidfuzz.distance import Levenshtein
+        from rapidfuzz.process import extractOne
+
+        keys = self.get_similarity_keys()
+        if len(keys) == 0:
+            return ""
+
+        return extractOne(word, keys, scorer=Levenshtein.distance)[0]
+
+    def get_most_similar_batch(self, words):
+        # Same as get_most_similar for every word, distances are computed for a block of words at once
+        from rapidfuzz.distance import Levenshtein
+        from rapidfuzz.process import cdist
+
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+
+        keys = self.get_similarity_keys()
+        if len(keys) == 0:
+            return ["" for _ in words]
+
+        if numpy is None:
+            return [self.get_most_similar(word) for word in words]
+
+        # Limit distance matrix of one block to around 64M entries
+        block_size = max(1, (64 * 1024 * 1024) // len(keys))
+
+        result = []
+        for block_start in range(0, len(words), block_size):
+            distances = cdist(words[block_start:block_start + block_size], keys, scorer=Levenshtein.distance, dtype=numpy.int32, workers=-1)
+            result.extend([keys[index] for index in distances.argmin(axis=1)])
+
+        return result
+
+    def get_morphology_table_filename(self):
+        # Morphology table is saved alongside the thesaurus
+        filename = self.get_filename()
+        return filename[:filename.rfind(".")] + "_morphology.json"
+
+    def get_file_fingerprint(self, filename):
+        stat = os.stat(filename)
+        return [stat.st_size, stat.st_mtime]
+
+    def load_morphology_table(self):
+        # Get saved morphology table data, or None if it does not exist or thesaurus has changed since
+        filename = self.get_morphology_table_filename()
+        if not os.path.exists(filename):
+            return None
+
+        with open(filename) as morphology_table_file:
+            morphology_table_data = json.load(morphology_table_file)
+
+        if morphology_table_data["tesaurus"] != self.get_file_fingerprint(self.get_filename()):
+            return None
+
+        return morphology_table_data
+
+    def is_morphology_table_up_to_date(self, treebank_filename):
+        morphology_table_data = self.load_morphology_table()
+        return morphology_table_data is not None and morphology_table_data["treebank"] == self.get_file_fingerprint(treebank_filename)
+
+    def get_morphology_targets(self, lemmas):
+        return self.get_most_similar_batch([("pe" + lemma + "an").lower() for lemma in lemmas])
+
+    def save_morphology_table(self, lemmas, treebank_filename):
+        self.write_morphology_table(dict(zip(lemmas, self.get_morphology_targets(lemmas))), treebank_filename)
+
+    def write_morphology_table(self, table, treebank_filename):
+        with open(self.get_morphology_table_filename(), "w") as morphology_table_file:
+            json.dump({
+                "tesaurus" : self.get_file_fingerprint(self.get_filename()),
+                "treebank" : self.get_file_fingerprint(treebank_filename),
+                "table" : table,
+            }, morphology_table_file)
+
+        self.__morphology_table = None
+
+    def get_pruned_filename(self):
+        # Pruned thesaurus is saved alongside the full one
+        filename = self.get_filename()
+        return filename[:filename.rfind(".")] + "_pruned.json"
+
+    def save_pruned(self, words, lemmas, treebank_filename):
+        # Save the entries of words only (in the same order as in sinonim_dict) as a thesaurus of its own.
+        # Nominalization targets of lemmas are searched in the full thesaurus and saved as morphology table
+        # of the pruned one, so get_morphology_target gives the same results with both of them.
+        # Return the pruned Tesaurus
+        pruned_dict = {word: entry for word, entry in self.get_sinonim_dict().items() if word in words}
+        morphology_table = dict(zip(lemmas, self.get_morphology_targets(lemmas)))
+
+        pruned_filename = self.get_pruned_filename()
+        with open(pruned_filename, "w") as pruned_file:
+            json.dump(pruned_dict, pruned_file, ensure_ascii=False)
+
+        pruned_tesaurus = Tesaurus(pruned_filename)
+        pruned_tesaurus.write_morphology_table(morphology_table, treebank_filename)
+
+        return pruned_tesaurus
+
+    def get_morphology_table(self):
+        if self.__morphology_table is None:
+            morphology_table_data = self.load_morphology_table()
+            self.__morphology_table = morphology_table_data["table"] if morphology_table_data is not None else {}
+
+        return self.__morphology_table
+
+    def get_morphology_target(self, lemma):
+        # Same as get_most_similar("pe" + lemma + "an"), looked up in the precomputed table first.
+        # Lemmas missing from the table are computed once and kept in memory
+        morphology_table = self.get_morphology_table()
 
-        for key in sinonim_dict.keys():
+        if lemma not in morphology_table:
+            morphology_table[lemma] = self.get_most_similar(("pe" + lemma + "an").lower())
 
-            similarity = distance(word, key)
-            
-            if similarity < most_similar :
-                most_similar = similarity
-                string_similar = key
-                
-        return string_similar
\ No newline at end of file
+        return morphology_table[lemma]
@@ -0,0 +1,135 @@
+from .corpus import get_compression_extension, open_text
+from .export import RecordWriter
+
+
+class DatasetWriter():
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+        # Parallel outputs are compressed the same way as the main output
+        output_filename = dataset.output_filename
+        compression_extension = get_compression_extension(output_filename)
+        output_file_name = output_filename[:len(output_filename) - len(compression_extension)]
+        output_file_name = output_file_name[:output_file_name.rfind(".")]
+
+        self.stats_filename = f"{output_file_name}_statistics.txt"
+        txt_original_filename =  f"{output_file_name}_parallel_original.txt{compression_extension}"
+        txt_error_filename =  f"{output_file_name}_parallel_error.txt{compression_extension}"
+
+        self.file_m2 = open_text(output_filename, "w")
+        self.file_original = open_text(txt_original_filename, "w")
+        self.file_error = open_text(txt_error_filename, "w")
+
+        # Binary records are written along the text outputs, sentence by sentence
+        self.record_writer = None
+        if dataset.binary_output:
+            self.record_writer = RecordWriter(f"{output_file_name}_records.bin")
+
+        self.total_data = 0
+        self.total_with_error = 0
+
+    def write(self, original_sentence, error_sentence, edit_list):
+        # Sentences are separated (not terminated) by blank line in M2 output
+        # and by new line in parallel outputs
+        if self.total_data > 0:
+            self.file_m2.write("\n\n")
+            self.file_original.write("\n")
+            self.file_error.write("\n")
+
+        # Write Dataset in M2 Format
+        self.file_m2.write(self.dataset.get_m2(error_sentence, edit_list))
+
+        # Write dataset in parallel sentence format
+        self.file_original.write(original_sentence)
+        self.file_error.write(error_sentence)
+
+        if self.record_writer is not None:
+            self.record_writer.write(original_sentence, error_sentence, edit_list)
+
+        self.total_data += 1
+        if len(edit_list) > 0:
+            self.total_with_error += 1
+
+    def write_all(self, result_list):
+        for original_sentence, error_sentence, edit_list in result_list:
+            self.write(original_sentence, error_sentence, edit_list)
+
+    def close(self):
+        self.file_m2.close()
+        self.file_original.close()
+        self.file_error.close()
+
+        if self.record_writer is not None:
+            self.record_writer.close()
+
+        self.write_statistics()
+
+    def write_statistics(self):
+        dataset = self.dataset
+
+        # Write stats of dataset
+        with open(self.stats_filename, "w", encoding="ascii") as stat_file_output:
+            # Total Data
+            total_data = self.total_data
+            total_with_error = self.total_with_error
+            total_without_error = total_data - total_with_error
+
+            stat_file_output.write(f"Total Kalimat: {total_data}\n")
+            if total_data > 0:
+                stat_file_output.write(f"Total Kalimat dengan Error: {total_with_error} ({total_with_error / total_data * 100:.2f}%)\n")
+                stat_file_output.write(f"Total Kalimat tanpa Error: {total_without_error} ({total_without_error / total_data * 100:.2f}%)\n\n")
+            else:
+                stat_file_output.write(f"Total Kalimat dengan Error: {total_with_error} ({0:.2f}%)\n")
+                stat_file_output.write(f"Total Kalimat tanpa Error: {total_without_error} ({0:.2f}%)\n\n")
+
+            total_all_error = dataset.get_total_error()
+
+            # Total Error yang dibangkitkan
+            stat_file_output.write(f"Total Error Dibangkitkan: {total_all_error}\n\n")
+
+            stat_file_output.write(f"Total Tiap Jenis Error:\n")
+            # Number of and percentage of each error type
+            for error_type_id in dataset.error_dict.keys():
+                total_each_error_type = dataset.error_dict[error_type_id]["count"]
+                if total_all_error > 0:
+                    ratio_each_error_type = total_each_error_type / total_all_error * 100
+                else:
+                    ratio_each_error_type = 0
+
+                stat_file_output.write(f"- {error_type_id}: {total_each_error_type} ({ratio_each_error_type:.2f}%)\n")
+
+            if dataset.scheduler is not None:
+                stat_file_output.write("\nTarget Tiap Jenis Error:\n")
+                for error_type_id in dataset.error_dict.keys():
+                    total_each_error_type = dataset.error_dict[error_type_id]["count"]
+                    target_each_error_type = dataset.scheduler.target_count[error_type_id]
+                    stat_file_output.write(f"- {error_type_id}: {total_each_error_type} dari {target_each_error_type}\n")
+
+            if dataset.scheduler is None:
+                stat_file_output.write("\nKalimat dengan Jenis Error Dilewati (Rasio Maksimal Tercapai):\n")
+                for error_type_id in dataset.error_dict.keys():
+                    stat_file_output.write(f"- {error_type_id}: {dataset.error_dict[error_type_id]['skip_count']}\n")
+
+            transform_cache_info_dict = {}
+            for error_type_id in dataset.error_dict.keys():
+                cache_info = dataset.error_dict[error_type_id]["class"].get_transform_cache_info()
+                if cache_info is not None:
+                    transform_cache_info_dict[error_type_id] = cache_info
+
+            if transform_cache_info_dict:
+                stat_file_output.write("\nCache Transformasi Morfologi:\n")
+                for error_type_id, cache_info in transform_cache_info_dict.items():
+                    total_lookup = cache_info.hits + cache_info.misses
+                    hit_rate = cache_info.hits / total_lookup * 100 if total_lookup > 0 else 0
+                    stat_file_output.write(f"- {error_type_id}: {cache_info.hits} dari {total_lookup} token ({hit_rate:.2f}%)\n")
+
+            if dataset.prefilter is not None:
+                prefilter = dataset.prefilter
+                stat_file_output.write(f"\nKalimat Ditolak Prafilter: {prefilter.get_total_reject()}\n")
+                for reason, count in prefilter.reject_count.items():
+                    stat_file_output.write(f"- {reason}: {count}\n")
+
+            if dataset.sentence_cache is not None:
+                sentence_cache = dataset.sentence_cache
+                stat_file_output.write(f"\nCache Kalimat: {sentence_cache.total_hit} dari {sentence_cache.total_lookup} kalimat ({sentence_cache.get_hit_rate() * 100:.2f}%)\n")